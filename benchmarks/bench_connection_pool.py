@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Compare per-call ``httpx.AsyncClient`` against the shared connection pool.
+
+Runs the same request load against a local mock API twice: once opening a
+fresh client for every call (the previous behaviour) and once through
+``TrainingPeaksClient`` with a ``SharedHTTPClient``. Reports the number of
+connections (handshakes) the mock API accepted and p50/p99 latency.
+
+Usage:
+    python benchmarks/bench_connection_pool.py --requests 500 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+from mock_api import MockTrainingPeaksAPI
+
+from trainingpeaks_mcp_server.auth import TrainingPeaksAuth
+from trainingpeaks_mcp_server.client import TrainingPeaksClient
+from trainingpeaks_mcp_server.config import TrainingPeaksConfig
+from trainingpeaks_mcp_server.http_client import SharedHTTPClient
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples`` (nearest rank)."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_load(
+    call: Callable[[], Awaitable[Any]], requests: int, concurrency: int
+) -> List[float]:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def summarize(
+    name: str, api: MockTrainingPeaksAPI, latencies: List[float], elapsed: float
+) -> Dict[str, Any]:
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "connections": api.connections,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
+
+
+async def bench(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    async with MockTrainingPeaksAPI(
+        latency=args.latency, handshake_delay=args.handshake_delay
+    ) as api:
+        url = f"{api.base_url}/v1/athlete"
+        headers = {"Authorization": "Bearer mock-access-token"}
+
+        async def per_call() -> Any:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, headers=headers, timeout=30.0)
+                response.raise_for_status()
+                return response.json()
+
+        api.reset_counters()
+        start = time.perf_counter()
+        latencies = await run_load(per_call, args.requests, args.concurrency)
+        results.append(
+            summarize("per-call", api, latencies, time.perf_counter() - start)
+        )
+
+        # Measure the pool alone: every call goes to the mock API, and no
+        # tokens, workouts or rate-limit state leak in from the environment.
+        config = TrainingPeaksConfig(
+            base_url=api.base_url,
+            http2=args.http2,
+            token_store_path=None,
+            workout_store_path=None,
+            cache_enabled=False,
+            coalesce_requests=False,
+            rate_limit_enabled=False,
+            hedge_enabled=False,
+        )
+        http = SharedHTTPClient(config)
+        auth = TrainingPeaksAuth(config=config, http=http)
+        auth.set_tokens("mock-access-token", "mock-refresh-token", 3600)
+        client = TrainingPeaksClient(auth)
+
+        api.reset_counters()
+        start = time.perf_counter()
+        latencies = await run_load(
+            client.get_athlete_profile, args.requests, args.concurrency
+        )
+        results.append(summarize("pooled", api, latencies, time.perf_counter() - start))
+        await http.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="Per-request server latency in seconds")
+    parser.add_argument("--handshake-delay", type=float, default=0.02,
+                        help="Per-connection delay emulating a TLS handshake")
+    parser.add_argument("--http2", action="store_true",
+                        help="Request HTTP/2 for the pooled client")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(bench(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
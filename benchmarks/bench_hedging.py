@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Compare GET latency with and without hedged requests under a slow tail.
+
+Runs the same sequential load against a local mock API in which a share of
+requests (``--tail-rate``, 5% by default) take ``--tail-latency`` longer,
+once with hedging off and once with it on. Reports p50/p99 latency and how
+many requests were hedged and won by the hedge.
+
+Usage:
+    python benchmarks/bench_hedging.py --requests 300 --tail-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from mock_api import MockTrainingPeaksAPI
+
+from trainingpeaks_mcp_server.auth import TrainingPeaksAuth
+from trainingpeaks_mcp_server.client import TrainingPeaksClient
+from trainingpeaks_mcp_server.config import TrainingPeaksConfig
+from trainingpeaks_mcp_server.http_client import SharedHTTPClient
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples`` (nearest rank)."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_mode(
+    args: argparse.Namespace, hedge_enabled: bool
+) -> Dict[str, Any]:
+    async with MockTrainingPeaksAPI(
+        latency=args.latency,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        seed=args.seed,
+    ) as api:
+        # Every call goes to the mock API; only hedging differs between runs
+        config = TrainingPeaksConfig(
+            base_url=api.base_url,
+            token_store_path=None,
+            workout_store_path=None,
+            cache_enabled=False,
+            coalesce_requests=False,
+            rate_limit_enabled=False,
+            hedge_enabled=hedge_enabled,
+        )
+        http = SharedHTTPClient(config)
+        auth = TrainingPeaksAuth(config=config, http=http)
+        auth.set_tokens("mock-access-token", "mock-refresh-token", 3600)
+        client = TrainingPeaksClient(auth)
+
+        latencies: List[float] = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            await client.get_athlete_profile()
+            latencies.append(time.perf_counter() - start)
+        hedging = client.breaker.stats()
+        await http.aclose()
+    return {
+        "mode": "hedged" if hedge_enabled else "plain",
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "hedged": hedging["hedged"],
+        "hedge_wins": hedging["hedge_wins"],
+    }
+
+
+async def bench(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    return [await run_mode(args, False), await run_mode(args, True)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="Per-request server latency in seconds")
+    parser.add_argument("--tail-rate", type=float, default=0.05,
+                        help="Share of requests that are slow outliers")
+    parser.add_argument("--tail-latency", type=float, default=0.5,
+                        help="Extra latency of a slow outlier in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(bench(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Measure cold-start latency of the MCP server over stdio.
+
+Launches ``python -m trainingpeaks_mcp_server.server`` repeatedly, the way an
+MCP host does, and times how long it takes to answer ``initialize``,
+``tools/list`` and a first ``tools/call`` (served by a local mock API, so the
+deferred client construction is included).
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from mock_api import MockTrainingPeaksAPI
+
+
+def request(request_id: int, method: str, params: Dict[str, Any]) -> bytes:
+    return json.dumps(
+        {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    ).encode() + b"\n"
+
+
+async def read_response(stream: asyncio.StreamReader, request_id: int) -> Dict[str, Any]:
+    """Read JSON-RPC messages until the response to ``request_id`` arrives."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            raise RuntimeError("Server exited before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+async def one_run(base_url: str, state_dir: str) -> Dict[str, float]:
+    env = dict(
+        os.environ,
+        TRAININGPEAKS_BASE_URL=base_url,
+        TRAININGPEAKS_TOKEN_STORE_PATH=os.path.join(state_dir, "tokens.json"),
+        TRAININGPEAKS_WORKOUT_STORE_PATH=os.path.join(state_dir, "workouts.db"),
+    )
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "trainingpeaks_mcp_server.server",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        env=env,
+    )
+    assert process.stdin is not None and process.stdout is not None
+    timings: Dict[str, float] = {}
+    try:
+        process.stdin.write(request(1, "initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench-startup", "version": "0"},
+        }))
+        await read_response(process.stdout, 1)
+        timings["initialize"] = time.perf_counter() - start
+
+        process.stdin.write(json.dumps(
+            {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        ).encode() + b"\n")
+        process.stdin.write(request(2, "tools/list", {}))
+        await read_response(process.stdout, 2)
+        timings["list_tools"] = time.perf_counter() - start
+
+        process.stdin.write(request(3, "tools/call", {
+            "name": "get_athlete_profile", "arguments": {}
+        }))
+        await read_response(process.stdout, 3)
+        timings["first_call"] = time.perf_counter() - start
+    finally:
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+    return timings
+
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    runs: List[Dict[str, float]] = []
+    async with MockTrainingPeaksAPI(latency=0) as api:
+        with tempfile.TemporaryDirectory() as state_dir:
+            with open(os.path.join(state_dir, "tokens.json"), "w") as f:
+                json.dump({
+                    "access_token": "mock-access-token",
+                    "refresh_token": "mock-refresh-token",
+                    "expires_at": time.time() + 3600,
+                }, f)
+            for _ in range(args.warmup):
+                await one_run(api.base_url, state_dir)
+            for _ in range(args.runs):
+                runs.append(await one_run(api.base_url, state_dir))
+
+    result: Dict[str, Any] = {"runs": args.runs}
+    for phase in ("initialize", "list_tools", "first_call"):
+        samples = [run[phase] * 1000 for run in runs]
+        result[phase] = {
+            "median_ms": round(statistics.median(samples), 1),
+            "min_ms": round(min(samples), 1),
+            "max_ms": round(max(samples), 1),
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Untimed runs to warm the OS file cache")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(bench(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Drive MCP tool calls against the local mock API at several concurrency levels.
+
+Each scenario calls ``TrainingPeaksMCPServer.call_tool`` in-process, so the
+numbers cover dispatch, the API client, caching, analytics and serialization.
+For every scenario and concurrency level it reports throughput, latency
+percentiles, errors and peak Python memory allocated (measured in a separate
+pass under ``tracemalloc``, which would otherwise skew latency).
+
+Results are written as JSON; pass a previous run with ``--compare`` to print
+the change in throughput and p95 latency.
+
+Usage:
+    python benchmarks/bench_tools.py --concurrency 1 4 16 --calls 200
+    python benchmarks/bench_tools.py --no-cache --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench_connection_pool import percentile
+from mock_api import MockTrainingPeaksAPI
+
+Scenario = Tuple[str, str, Dict[str, Any]]
+
+
+def scenarios() -> List[Scenario]:
+    """Get the (label, tool, arguments) workloads, relative to today."""
+    today = date.today()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    return [
+        ("profile", "get_athlete_profile", {}),
+        ("workouts_30d", "get_workouts", {
+            "start_date": month_ago, "end_date": today.isoformat()
+        }),
+        ("workouts_1y_all", "get_workouts", {
+            "start_date": year_ago, "end_date": today.isoformat(), "fetch_all": True
+        }),
+        ("workout_details", "get_workout_details", {
+            "workout_id": str(today.toordinal())
+        }),
+        ("details_batch_20", "get_workout_details_batch", {
+            "workout_ids": [str(today.toordinal() - i) for i in range(20)]
+        }),
+        ("calendar_1y", "get_calendar_events", {
+            "start_date": year_ago, "end_date": today.isoformat()
+        }),
+        ("metrics_1y_weekly", "get_metrics", {
+            "metric_type": "hrv", "start_date": year_ago,
+            "end_date": today.isoformat(), "aggregate": "weekly",
+            "percentiles": [10, 50, 90], "baseline_days": 28
+        }),
+        ("planned", "get_planned_workouts", {}),
+        ("pmc_summary", "get_performance_management", {}),
+    ]
+
+
+async def run_calls(
+    server: Any, tool: str, arguments: Dict[str, Any], calls: int, concurrency: int
+) -> Tuple[List[float], int, float]:
+    """Issue ``calls`` tool calls with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            result = await server.call_tool(tool, arguments)
+            latencies.append(time.perf_counter() - start)
+            if result.isError:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def measure_memory(
+    server: Any, tool: str, arguments: Dict[str, Any], calls: int, concurrency: int
+) -> float:
+    """Get the peak KiB allocated while running the workload."""
+    tracemalloc.start()
+    try:
+        await run_calls(server, tool, arguments, calls, concurrency)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def configure(base_url: str, state_dir: str, cache: bool, rate_limit: bool) -> None:
+    """Point the server's configuration at the mock API and a scratch directory."""
+    os.environ.update({
+        "TRAININGPEAKS_BASE_URL": base_url,
+        "TRAININGPEAKS_TOKEN_STORE_PATH": "",
+        "TRAININGPEAKS_CACHE_ENABLED": str(cache).lower(),
+        "TRAININGPEAKS_RATE_LIMIT_ENABLED": str(rate_limit).lower(),
+        "TRAININGPEAKS_WORKOUT_STORE_PATH": (
+            os.path.join(state_dir, "workouts.db") if cache else ""
+        ),
+    })
+    from trainingpeaks_mcp_server.config import get_config
+
+    get_config.cache_clear()
+
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    from trainingpeaks_mcp_server.server import TrainingPeaksMCPServer
+
+    results: List[Dict[str, Any]] = []
+    async with MockTrainingPeaksAPI(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=0.05,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        payload_bytes=args.payload_bytes,
+        samples=args.samples,
+    ) as api:
+        with tempfile.TemporaryDirectory() as state_dir:
+            configure(
+                api.base_url,
+                state_dir,
+                cache=not args.no_cache,
+                rate_limit=not args.no_rate_limit
+            )
+            server = TrainingPeaksMCPServer()
+            server.auth.set_tokens("mock-access-token", "mock-refresh-token", 3600)
+            try:
+                for label, tool, arguments in scenarios():
+                    if args.only and label not in args.only:
+                        continue
+                    for concurrency in args.concurrency:
+                        # One untimed call warms caches, the store and imports
+                        await server.call_tool(tool, arguments)
+                        api.reset_counters()
+                        latencies, errors, elapsed = await run_calls(
+                            server, tool, arguments, args.calls, concurrency
+                        )
+                        upstream = api.requests
+                        row: Dict[str, Any] = {
+                            "scenario": label,
+                            "tool": tool,
+                            "concurrency": concurrency,
+                            "calls": len(latencies),
+                            "errors": errors,
+                            "upstream_requests": upstream,
+                            "throughput_cps": round(len(latencies) / elapsed, 1),
+                            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                            "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+                        }
+                        if not args.no_memory:
+                            row["peak_alloc_kib"] = await measure_memory(
+                                server, tool, arguments,
+                                min(args.calls, args.memory_calls), concurrency
+                            )
+                        results.append(row)
+                        print(json.dumps(row), file=sys.stderr)
+            finally:
+                await server.aclose()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe throughput and p95 changes against a previous run."""
+    previous = {
+        (row["scenario"], row["concurrency"]): row for row in baseline["results"]
+    }
+    lines = []
+    for row in current["results"]:
+        old = previous.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        throughput = (row["throughput_cps"] / old["throughput_cps"] - 1) * 100
+        p95 = (row["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+        lines.append(
+            f"{row['scenario']:<20} c={row['concurrency']:<3} "
+            f"throughput {throughput:+6.1f}%  p95 {p95:+6.1f}%"
+        )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--calls", type=int, default=100,
+                        help="Tool calls per scenario and concurrency level")
+    parser.add_argument("--only", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="Per-request mock API latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 429")
+    parser.add_argument("--tail-rate", type=float, default=0.0,
+                        help="Fraction of requests delayed by --tail-latency")
+    parser.add_argument("--tail-latency", type=float, default=1.0,
+                        help="Extra latency in seconds of slow outliers")
+    parser.add_argument("--payload-bytes", type=int, default=0,
+                        help="Description padding added to every workout")
+    parser.add_argument("--samples", type=int, default=0,
+                        help="Per-second samples included in workout details")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the response cache and workout store")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Disable the client-side rate limiter")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass")
+    parser.add_argument("--memory-calls", type=int, default=20,
+                        help="Tool calls in the tracemalloc pass")
+    parser.add_argument("--output", default="bench_tools.json",
+                        help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(bench(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(report, json.load(f))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Local stand-in for the TrainingPeaks API used by the benchmarks.
+
+This is a minimal HTTP/1.1 server built on ``asyncio`` streams. It supports
+keep-alive and ``ETag`` revalidation for GETs, and counts accepted
+connections so benchmarks can report how many TCP (and, in production, TLS)
+handshakes a client performed. A configurable
+``handshake_delay`` is charged once per new connection to emulate the cost of
+a TLS handshake against the real API.
+
+Responses are deterministic: one workout per day (its ID is the day's
+ordinal), one metric value per day, one calendar event per week and a
+planned workout for each upcoming day. ``payload_bytes`` pads workouts with a
+description of that size and ``samples`` adds per-second power and heart
+rate streams to workout details, to emulate heavier accounts.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Zone bounds (watts, bpm) reported by /v1/athlete/zones
+ZONES = {
+    "power": [(0, 137), (138, 187), (188, 225), (226, 262), (263, 300), (301, 2000)],
+    "heartRate": [(0, 122), (123, 144), (145, 158), (159, 170), (171, 220)],
+}
+
+# Typical daily value per metric type
+METRIC_LEVELS = {
+    "weight": 70.0, "hrv": 65.0, "steps": 9000.0, "stress": 30.0, "sleep": 7.5
+}
+
+Handler = Callable[[str, Dict[str, str], bytes], Tuple[int, Dict[str, Any]]]
+
+
+class MockTrainingPeaksAPI:
+    """Serve canned TrainingPeaks responses on a local port."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        handshake_delay: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.1,
+        tail_rate: float = 0.0,
+        tail_latency: float = 1.0,
+        payload_bytes: int = 0,
+        samples: int = 0,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.handshake_delay = handshake_delay
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.payload_bytes = payload_bytes
+        self.samples = samples
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.status_counts: Dict[int, int] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.routes: Dict[Tuple[str, str], Handler] = {
+            ("GET", "/v1/athlete"): self._athlete,
+            ("GET", "/v1/athlete/zones"): self._zones,
+            ("GET", "/v1/athlete/workouts"): self._workouts,
+            ("GET", "/v1/athlete/calendar"): self._calendar,
+            ("GET", "/v1/athlete/metrics"): self._metrics,
+            ("GET", "/v1/athlete/planned-workouts"): self._planned_workouts,
+            ("POST", "/oauth/token"): self._token,
+        }
+
+    @property
+    def base_url(self) -> str:
+        """Get the base URL clients should point at."""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening; ``port=0`` picks a free port."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and close the server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def reset_counters(self) -> None:
+        """Reset connection and request counters."""
+        self.connections = 0
+        self.requests = 0
+        self.status_counts = {}
+
+    async def __aenter__(self) -> "MockTrainingPeaksAPI":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0"))
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.tail_rate and self.random.random() < self.tail_rate:
+                    # A slow outlier, as from a busy upstream instance
+                    await asyncio.sleep(self.tail_latency)
+                status, extra_headers, payload = self.inject_fault()
+                if not status:
+                    status, extra_headers, payload = self.dispatch(
+                        method, target, headers, body
+                    )
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, extra_headers, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def inject_fault(self) -> Tuple[int, Dict[str, str], bytes]:
+        """Pick an injected 429 or 5xx response; status 0 means none."""
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            headers = {"Retry-After": str(self.retry_after)}
+            return 429, headers, json.dumps({"error": "rate limited"}).encode()
+        if roll < self.throttle_rate + self.error_rate:
+            return 503, {}, json.dumps({"error": "unavailable"}).encode()
+        return 0, {}, b""
+
+    def dispatch(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Route a request to its handler and encode the JSON response."""
+        parts = urlsplit(target)
+        handler = self.routes.get((method, parts.path))
+        if handler is None and parts.path.startswith("/v1/athlete/workouts/"):
+            handler = self._workout_details
+        if handler is None:
+            return 404, {}, json.dumps({"error": "not found"}).encode()
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        status, payload = handler(parts.path, query, body)
+        encoded = json.dumps(payload).encode()
+        if method != "GET" or status != 200:
+            return status, {}, encoded
+        etag = '"%s"' % hashlib.sha1(encoded).hexdigest()
+        if headers.get("if-none-match") == etag:
+            return 304, {"ETag": etag}, b""
+        return status, {"ETag": etag}, encoded
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter,
+        status: int,
+        headers: Dict[str, str],
+        payload: bytes,
+        keep_alive: bool,
+    ) -> None:
+        lines = [
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+
+    def _athlete(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"id": 1, "firstName": "Mock", "lastName": "Athlete"}
+
+    def _zones(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        return 200, {
+            kind: [
+                {"zone": i + 1, "min": low, "max": high}
+                for i, (low, high) in enumerate(bounds)
+            ]
+            for kind, bounds in ZONES.items()
+        }
+
+    def _token(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        return 200, {
+            "access_token": "mock-access-token",
+            "refresh_token": "mock-refresh-token",
+            "expires_in": 3600,
+        }
+
+    @staticmethod
+    def _range(query: Dict[str, str], default_days: int = 30) -> Tuple[date, date]:
+        end = date.fromisoformat(query.get("endDate", date.today().isoformat()))
+        start = date.fromisoformat(
+            query.get("startDate", (end - timedelta(days=default_days)).isoformat())
+        )
+        return start, end
+
+    def _workout(self, day: date) -> Dict[str, Any]:
+        workout = {
+            "id": day.toordinal(),
+            "workoutDay": f"{day.isoformat()}T00:00:00",
+            "title": "Endurance ride",
+            "workoutType": "Bike",
+            "totalTime": 1.5,
+            "tssActual": 60 + day.toordinal() % 40,
+        }
+        if self.payload_bytes:
+            workout["description"] = "x" * self.payload_bytes
+        return workout
+
+    def _workouts(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        start, end = self._range(query)
+        limit = int(query.get("limit", "50"))
+        workouts = []
+        day = start
+        while day <= end and len(workouts) < limit:
+            workouts.append(self._workout(day))
+            day += timedelta(days=1)
+        return 200, {"workouts": workouts}
+
+    def _calendar(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        start, end = self._range(query)
+        events = []
+        day = start + timedelta(days=(6 - start.weekday()) % 7)
+        while day <= end:
+            events.append({
+                "id": day.toordinal(),
+                "date": day.isoformat(),
+                "name": "Group ride",
+                "eventType": "Other",
+            })
+            day += timedelta(days=7)
+        return 200, {"events": events}
+
+    def _metrics(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        start, end = self._range(query)
+        level = METRIC_LEVELS.get(query.get("type", ""), 50.0)
+        metrics = []
+        day = start
+        while day <= end:
+            n = day.toordinal()
+            wave = math.sin(n / 7.0) + 0.5 * math.sin(n / 29.0)
+            metrics.append({
+                "date": day.isoformat(),
+                "type": query.get("type"),
+                "value": round(level * (1 + 0.05 * wave), 2),
+            })
+            day += timedelta(days=1)
+        return 200, {"metrics": metrics}
+
+    def _planned_workouts(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        today = date.today()
+        days = int(query.get("daysAhead", "7"))
+        workouts = []
+        for offset in range(1, days + 1):
+            workout = self._workout(today + timedelta(days=offset))
+            workout["tssPlanned"] = workout.pop("tssActual")
+            workouts.append(workout)
+        return 200, {"workouts": workouts}
+
+    def _workout_details(
+        self, path: str, query: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        workout_id = path.rsplit("/", 1)[-1]
+        if not workout_id.isdigit():
+            return 404, {"error": "workout not found"}
+        workout = self._workout(date.fromordinal(int(workout_id)))
+        if self.samples:
+            seconds = range(self.samples)
+            workout["samples"] = {
+                "power": [200 + int(60 * math.sin(t / 90.0)) for t in seconds],
+                "heartRate": [140 + int(15 * math.sin(t / 300.0)) for t in seconds],
+            }
+        return 200, workout
@@ -0,0 +1 @@
+"""Vectorized training analytics built on NumPy."""
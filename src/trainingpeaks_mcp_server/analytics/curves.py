@@ -0,0 +1,137 @@
+"""Mean-maximal curves per workout and best-effort envelopes across workouts."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..store import WorkoutStore
+
+# Durations (seconds) reported by default: sprint, anaerobic, VO2max, threshold
+DEFAULT_DURATIONS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# Sample channels a curve can be computed for
+CURVE_CHANNELS = ("power", "speed", "heartRate", "cadence")
+
+# Mean-maximal value by duration; None when the workout is shorter or lacks the channel
+Curve = Dict[int, Optional[float]]
+
+
+def mean_max(values: Optional[np.ndarray], durations: Sequence[int]) -> Curve:
+    """Get the best average of ``values`` over every window of each duration.
+
+    Missing samples count as zero (coasting, pauses). One cumulative sum
+    serves every duration: each window sum is a difference of two prefix
+    sums, so a duration costs one vectorized pass over the workout.
+    """
+    if values is None or not len(values):
+        return {duration: None for duration in durations}
+    sums = np.concatenate(([0.0], np.cumsum(np.nan_to_num(values.astype(np.float64)))))
+    n = len(values)
+    curve: Curve = {}
+    for duration in durations:
+        if duration > n or duration < 1:
+            curve[duration] = None
+        else:
+            best = float((sums[duration:] - sums[:-duration]).max()) / duration
+            curve[duration] = round(best, 1)
+    return curve
+
+
+class CurveIndex:
+    """Mean-maximal points by workout, channel and duration.
+
+    Points persist in the workout store when there is one, so curves are
+    computed once per workout and survive restarts; otherwise they are kept
+    in memory for the athlete's session.
+    """
+
+    def __init__(self, store: Optional[WorkoutStore] = None):
+        self.store = store
+        self._points: Dict[Tuple[str, str], Curve] = {}
+
+    def get(self, workout_ids: Sequence[str], channel: str) -> Dict[str, Curve]:
+        """Get the known points of each workout that has any."""
+        if self.store is not None:
+            return self.store.curve_points(workout_ids, channel)
+        return {
+            workout_id: self._points[(workout_id, channel)]
+            for workout_id in workout_ids
+            if (workout_id, channel) in self._points
+        }
+
+    def missing(
+        self,
+        workout_ids: Sequence[str],
+        channel: str,
+        durations: Sequence[int]
+    ) -> Dict[str, List[int]]:
+        """Get the durations not yet computed, by workout ID."""
+        known = self.get(workout_ids, channel)
+        missing: Dict[str, List[int]] = {}
+        for workout_id in workout_ids:
+            points = known.get(workout_id, {})
+            todo = [duration for duration in durations if duration not in points]
+            if todo:
+                missing[workout_id] = todo
+        return missing
+
+    def add(self, workout_id: str, channel: str, curve: Curve) -> None:
+        """Record a workout's points for a channel."""
+        if self.store is not None:
+            self.store.save_curve_points(
+                channel,
+                ((workout_id, duration, value) for duration, value in curve.items())
+            )
+        else:
+            self._points.setdefault((workout_id, channel), {}).update(curve)
+
+
+def envelope(
+    curves: Dict[str, Curve],
+    days: Dict[str, Optional[str]],
+    durations: Sequence[int],
+    top: int = 1
+) -> List[Dict[str, Any]]:
+    """Get the best value per duration across workouts and which workouts hold it.
+
+    Each entry has the record's ``value``, ``workout_id`` and ``date``; with
+    ``top`` above one, the next best efforts follow under ``runners_up``.
+    """
+    workout_ids = list(curves)
+    matrix = np.full((len(workout_ids), len(durations)), np.nan)
+    for row, workout_id in enumerate(workout_ids):
+        points = curves[workout_id]
+        for column, duration in enumerate(durations):
+            value = points.get(duration)
+            if value is not None:
+                matrix[row, column] = value
+    # Highest first, workouts without a value last
+    order = np.argsort(-np.nan_to_num(matrix, nan=-np.inf), axis=0, kind="stable")
+
+    result: List[Dict[str, Any]] = []
+    for column, duration in enumerate(durations):
+        records = []
+        for row in order[:top, column]:
+            value = matrix[row, column]
+            if np.isnan(value):
+                break
+            workout_id = workout_ids[row]
+            records.append({
+                "value": float(value),
+                "workout_id": workout_id,
+                "date": days.get(workout_id),
+            })
+        entry: Dict[str, Any] = {"duration_s": int(duration)}
+        if records:
+            entry.update(records[0])
+        else:
+            entry["value"] = None
+        if top > 1:
+            entry["runners_up"] = records[1:]
+        result.append(entry)
+    return result
+
+
+def speed_to_pace(speed: Optional[float]) -> Optional[float]:
+    """Convert a speed in m/s to a pace in seconds per kilometre."""
+    if not speed:
+        return None
+    return round(1000.0 / speed, 1)
@@ -0,0 +1,244 @@
+"""Performance Management Chart: fitness (CTL), fatigue (ATL) and form (TSB)."""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from ..dates import format_date, parse_date, workout_date
+
+# Keys under which the API reports a workout's Training Stress Score
+TSS_KEYS = ("tssActual", "TssActual", "tss", "TSS", "trainingStressScore")
+
+# Days per vectorized EWMA block; keeps decay powers well inside float64 range
+EWMA_BLOCK = 256
+
+# Largest decay (natural log) spanned by one block: a**i stays above 1e-150
+EWMA_MAX_LOG_DECAY = 345.0
+
+# Below this block length the plain recurrence is used instead
+EWMA_MIN_BLOCK = 8
+
+
+def workout_tss(workout: Dict[str, Any]) -> float:
+    """Get a workout's TSS, or 0 if it has none."""
+    for key in TSS_KEYS:
+        value = workout.get(key)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return 0.0
+    return 0.0
+
+
+def daily_tss(workouts: Iterable[Dict[str, Any]], start: date, end: date) -> np.ndarray:
+    """Sum workout TSS into one value per day from ``start`` to ``end``."""
+    days = (end - start).days + 1
+    offsets: List[int] = []
+    weights: List[float] = []
+    for workout in workouts:
+        day = workout_date(workout)
+        if day is None:
+            continue
+        offset = (parse_date(day) - start).days
+        if 0 <= offset < days:
+            offsets.append(offset)
+            weights.append(workout_tss(workout))
+    if not offsets:
+        return np.zeros(max(days, 0))
+    return np.bincount(offsets, weights=weights, minlength=days).astype(np.float64)
+
+
+def ewma(values: np.ndarray, time_constant: float, initial: float = 0.0) -> np.ndarray:
+    """Compute ``y[t] = y[t-1] + (x[t] - y[t-1]) / time_constant`` vectorized.
+
+    Within a block, ``y[t] = a**t * (y0 + k * sum(x[i] / a**i))`` with
+    ``a = 1 - k``; blocks are short enough that ``a**i`` cannot underflow.
+    Time constants near 1 decay too fast for any useful block and use the
+    recurrence directly.
+    """
+    k = 1.0 / time_constant
+    a = 1.0 - k
+    size = min(EWMA_BLOCK, int(EWMA_MAX_LOG_DECAY / -np.log(a))) if 0.0 < a < 1.0 else 0
+    if size < EWMA_MIN_BLOCK:
+        return _ewma_recurrence(values, k, initial)
+    out = np.empty(len(values), dtype=np.float64)
+    carry = initial
+    for start in range(0, len(values), size):
+        block = values[start:start + size]
+        powers = a ** np.arange(1, len(block) + 1)
+        result = powers * (carry + k * np.cumsum(block / powers))
+        out[start:start + len(block)] = result
+        carry = float(result[-1])
+    return out
+
+
+def _ewma_recurrence(values: np.ndarray, k: float, initial: float) -> np.ndarray:
+    out = np.empty(len(values), dtype=np.float64)
+    y = initial
+    for i, x in enumerate(values.tolist()):
+        y += (x - y) * k
+        out[i] = y
+    return out
+
+
+class PMCEngine:
+    """Daily TSS history with incrementally maintained CTL/ATL series.
+
+    ``update`` merges new daily TSS and only invalidates computed loads from
+    the first day that changed, so appending recent days recomputes just the
+    tail of a multi-year series.
+    """
+
+    def __init__(self) -> None:
+        self.start: Optional[date] = None
+        self.tss = np.zeros(0)
+        self._loads: Dict[Tuple[float, float], Tuple[np.ndarray, np.ndarray]] = {}
+        self._valid: Dict[Tuple[float, float], int] = {}
+
+    @property
+    def end(self) -> Optional[date]:
+        """Get the last day covered, if any."""
+        if self.start is None or not len(self.tss):
+            return None
+        return self.start + timedelta(days=len(self.tss) - 1)
+
+    def update(self, start: date, tss: np.ndarray) -> None:
+        """Merge daily TSS for consecutive days beginning at ``start``."""
+        if self.start is None:
+            self.start = start
+            self.tss = tss.astype(np.float64)
+            self._valid = {key: 0 for key in self._valid}
+            return
+
+        if start < self.start:
+            padding = (self.start - start).days
+            self.tss = np.concatenate([np.zeros(padding), self.tss])
+            self.start = start
+            # Everything depends on the new earliest days
+            self._valid = {key: 0 for key in self._valid}
+
+        offset = (start - self.start).days
+        needed = offset + len(tss)
+        if needed > len(self.tss):
+            self.tss = np.concatenate([self.tss, np.zeros(needed - len(self.tss))])
+
+        current = self.tss[offset:needed]
+        changed = np.flatnonzero(current != tss)
+        if len(changed):
+            first_changed = offset + int(changed[0])
+            self.tss[offset:needed] = tss
+            self._valid = {
+                key: min(valid, first_changed) for key, valid in self._valid.items()
+            }
+
+    def loads(
+        self,
+        ctl_days: float = 42,
+        atl_days: float = 7
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get CTL and ATL arrays aligned with ``tss``, computing only stale days."""
+        key = (float(ctl_days), float(atl_days))
+        ctl, atl = self._loads.get(key, (np.zeros(0), np.zeros(0)))
+        valid = min(self._valid.get(key, 0), len(ctl), len(self.tss))
+        if valid < len(self.tss):
+            ctl_carry = float(ctl[valid - 1]) if valid else 0.0
+            atl_carry = float(atl[valid - 1]) if valid else 0.0
+            tail = self.tss[valid:]
+            ctl = np.concatenate([ctl[:valid], ewma(tail, ctl_days, ctl_carry)])
+            atl = np.concatenate([atl[:valid], ewma(tail, atl_days, atl_carry)])
+            self._loads[key] = (ctl, atl)
+        self._valid[key] = len(self.tss)
+        return ctl, atl
+
+    def series(
+        self,
+        start: date,
+        end: date,
+        ctl_days: float = 42,
+        atl_days: float = 7
+    ) -> Dict[str, np.ndarray]:
+        """Get daily TSS, CTL, ATL and TSB arrays for ``start``..``end``.
+
+        TSB (form) on a day is the previous day's CTL minus its ATL.
+        """
+        if (
+            self.start is None or self.end is None
+            or start < self.start or end > self.end
+        ):
+            raise ValueError("Requested range is not loaded into the PMC engine")
+        ctl, atl = self.loads(ctl_days, atl_days)
+        tsb = np.concatenate([[0.0], ctl[:-1] - atl[:-1]])
+        lo = (start - self.start).days
+        hi = (end - self.start).days + 1
+        return {
+            "tss": self.tss[lo:hi],
+            "ctl": ctl[lo:hi],
+            "atl": atl[lo:hi],
+            "tsb": tsb[lo:hi],
+        }
+
+
+def summarize(series: Dict[str, np.ndarray], start: date) -> Dict[str, Any]:
+    """Build a compact summary of a PMC series."""
+    ctl, tsb, tss = series["ctl"], series["tsb"], series["tss"]
+    if not len(ctl):
+        return {}
+    peak = int(np.argmax(ctl))
+    low_form = int(np.argmin(tsb))
+    week_ago = max(0, len(ctl) - 8)
+    return {
+        "start": {"date": format_date(start), **_point(series, 0)},
+        "end": {
+            "date": format_date(start + timedelta(days=len(ctl) - 1)),
+            **_point(series, -1),
+        },
+        "ctl_change": round(float(ctl[-1] - ctl[0]), 1),
+        "ramp_rate_7d": round(float(ctl[-1] - ctl[week_ago]), 1),
+        "peak_ctl": {
+            "date": format_date(start + timedelta(days=peak)),
+            "ctl": round(float(ctl[peak]), 1),
+        },
+        "lowest_tsb": {
+            "date": format_date(start + timedelta(days=low_form)),
+            "tsb": round(float(tsb[low_form]), 1),
+        },
+        "total_tss": round(float(tss.sum()), 1),
+        "training_days": int(np.count_nonzero(tss)),
+    }
+
+
+def to_columns(
+    series: Dict[str, np.ndarray],
+    start: date,
+    resolution: str = "daily"
+) -> Dict[str, List[Any]]:
+    """Convert a PMC series into compact columns, daily or one row per week.
+
+    Weekly rows carry the loads at the end of each week and the week's TSS.
+    """
+    days = len(series["ctl"])
+    if resolution == "weekly" and days:
+        weekdays = (start.weekday() + np.arange(days)) % 7
+        indexes = np.flatnonzero(weekdays == 6)
+        if not len(indexes) or indexes[-1] != days - 1:
+            indexes = np.append(indexes, days - 1)
+        week_starts = np.concatenate([[0], indexes[:-1] + 1])
+        tss = np.add.reduceat(series["tss"], week_starts)
+    elif resolution in ("daily", "weekly"):
+        indexes = np.arange(days)
+        tss = series["tss"]
+    else:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    return {
+        "date": [format_date(start + timedelta(days=int(i))) for i in indexes],
+        "tss": np.round(tss, 1).tolist(),
+        "ctl": np.round(series["ctl"][indexes], 1).tolist(),
+        "atl": np.round(series["atl"][indexes], 1).tolist(),
+        "tsb": np.round(series["tsb"][indexes], 1).tolist(),
+    }
+
+
+def _point(series: Dict[str, np.ndarray], index: int) -> Dict[str, float]:
+    return {
+        name: round(float(series[name][index]), 1) for name in ("ctl", "atl", "tsb")
+    }
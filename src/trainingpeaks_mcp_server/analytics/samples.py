@@ -0,0 +1,256 @@
+"""Compact storage, summaries and downsampled views of workout samples."""
+
+import json
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+try:
+    import ijson  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+# Key under which workout details carry per-sample channels
+SAMPLES_KEY = "samples"
+
+# Seconds between samples
+DEFAULT_INTERVAL = 1.0
+
+# ijson events that carry a single sample value
+VALUE_EVENTS = frozenset(("number", "null", "string", "boolean"))
+
+
+class WorkoutSamples:
+    """Per-sample channels (power, heart rate, ...) as contiguous float32 arrays.
+
+    Missing values are NaN; every channel has the same length. A float32
+    costs 4 bytes per value, against roughly 32 for a Python float in a list.
+    """
+
+    def __init__(
+        self,
+        channels: Dict[str, np.ndarray],
+        interval: float = DEFAULT_INTERVAL
+    ):
+        self.channels = channels
+        self.interval = interval
+
+    def __len__(self) -> int:
+        return max((len(values) for values in self.channels.values()), default=0)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory held by the sample arrays."""
+        return sum(values.nbytes for values in self.channels.values())
+
+    def channel(self, name: str) -> Optional[np.ndarray]:
+        """Get one channel's values, or None if the workout lacks it."""
+        return self.channels.get(name)
+
+    def summary(self, channels: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Get count, mean, min, max and standard deviation per channel."""
+        result: Dict[str, Any] = {}
+        for name in channels or self.channels:
+            values = self.channels.get(name)
+            if values is None:
+                continue
+            valid = values[~np.isnan(values)].astype(np.float64)
+            if not len(valid):
+                result[name] = {"count": 0}
+                continue
+            result[name] = {
+                "count": int(len(valid)),
+                "mean": round(float(valid.mean()), 1),
+                "min": round(float(valid.min()), 1),
+                "max": round(float(valid.max()), 1),
+                "sd": round(float(valid.std()), 1),
+            }
+        return result
+
+    def downsample(
+        self,
+        points: int,
+        channels: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Average every channel over equal time buckets, at most ``points`` of them.
+
+        All channels share the bucket boundaries, so the view stays columnar:
+        ``time_s`` holds each bucket's start offset in seconds.
+        """
+        names = [name for name in (channels or self.channels) if name in self.channels]
+        n = len(self)
+        size = max(1, -(-n // max(1, points)))
+        buckets = -(-n // size)
+        view: Dict[str, Any] = {
+            "interval_s": size * self.interval,
+            "time_s": (np.arange(buckets) * size * self.interval).tolist(),
+        }
+        for name in names:
+            view[name] = _bucket_means(self.channels[name], size, buckets)
+        return view
+
+    def view(
+        self,
+        points: int = 0,
+        channels: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Get the summary and, with ``points``, a downsampled series for a response."""
+        result: Dict[str, Any] = {
+            "count": len(self),
+            "interval_s": self.interval,
+            "duration_s": len(self) * self.interval,
+            "channels": self.summary(channels),
+        }
+        if points and len(self):
+            result["downsampled"] = self.downsample(points, channels)
+        return result
+
+
+class SampleStreamParser:
+    """Parse a workout document from byte chunks, packing samples into arrays.
+
+    With ``ijson`` installed the document is parsed incrementally and sample
+    values go straight into ``array('f')`` buffers, so no Python object is
+    created per value. Without it the body is buffered and parsed at the end.
+    Samples may be columnar (``{"power": [...], ...}``) or a list of records
+    (``[{"power": ..., "heartRate": ...}, ...]``).
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything fed so far, e.g. before a retried request."""
+        self.received = 0
+        self.size = 0
+        self._buffer = bytearray()
+        self._columns: Dict[str, "array[float]"] = {}
+        # ijson prefix of each channel's values -> that channel's buffer
+        self._targets: Dict[str, "array[float]"] = {}
+        self._records = 0
+        self._has_samples = False
+        if ijson is not None:
+            self._events = ijson.sendable_list()
+            self._parser = ijson.parse_coro(self._events, use_float=True)
+            self._builder = ijson.ObjectBuilder()
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the response body."""
+        self.received += len(chunk)
+        if ijson is None:
+            self._buffer += chunk
+            return
+        self._parser.send(chunk)
+        self._handle_events()
+
+    def result(self) -> Dict[str, Any]:
+        """Finish parsing; get the document with ``samples`` as ``WorkoutSamples``.
+
+        ``size`` is then set to the approximate bytes the result holds.
+        """
+        if ijson is None:
+            document = pack_samples(json.loads(bytes(self._buffer)))
+            self._buffer = bytearray()
+        else:
+            self._parser.close()
+            self._handle_events()
+            document = self._builder.value
+            if self._has_samples:
+                document[SAMPLES_KEY] = WorkoutSamples({
+                    name: np.frombuffer(values, dtype=np.float32)
+                    for name, values in self._columns.items()
+                })
+        samples = document.get(SAMPLES_KEY)
+        if isinstance(samples, WorkoutSamples):
+            rest = {key: value for key, value in document.items() if key != SAMPLES_KEY}
+            self.size = len(json.dumps(rest, default=str)) + samples.nbytes
+        else:
+            self.size = self.received
+        return document
+
+    def _handle_events(self) -> None:
+        columns = self._columns
+        targets = self._targets
+        builder = self._builder
+        nan = float("nan")
+        for prefix, event, value in self._events:
+            # Hot path: one lookup and one append per sample value
+            target = targets.get(prefix)
+            if target is not None and event in VALUE_EVENTS:
+                target.append(value if event == "number" else nan)
+                continue
+            if prefix == SAMPLES_KEY or prefix.startswith(SAMPLES_KEY + "."):
+                path = prefix.split(".")
+                if len(path) != 3 or event not in VALUE_EVENTS:
+                    pass
+                elif path[2] == "item":
+                    # Columnar: samples.<channel>.item
+                    values = columns.setdefault(path[1], array("f"))
+                    targets[prefix] = values
+                    values.append(_sample(value))
+                elif path[1] == "item":
+                    # Records: samples.item.<channel>
+                    known = columns.get(path[2])
+                    if known is None:
+                        known = columns[path[2]] = array("f", [nan]) * self._records
+                    values = targets[prefix] = known
+                    values.append(_sample(value))
+                if prefix == "samples.item" and event == "end_map":
+                    self._records += 1
+                    for values in columns.values():
+                        if len(values) < self._records:
+                            values.append(np.nan)
+            elif prefix == "" and event == "map_key" and value == SAMPLES_KEY:
+                self._has_samples = True
+            else:
+                builder.event(event, value)
+        del self._events[:]
+
+
+def pack_samples(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a parsed document's raw ``samples`` with ``WorkoutSamples``."""
+    raw = document.get(SAMPLES_KEY)
+    if isinstance(raw, dict):
+        document[SAMPLES_KEY] = WorkoutSamples({
+            name: np.array([_sample(v) for v in values], dtype=np.float32)
+            for name, values in raw.items()
+            if isinstance(values, list)
+        })
+    elif isinstance(raw, list):
+        names = list(dict.fromkeys(key for record in raw for key in record))
+        document[SAMPLES_KEY] = WorkoutSamples({
+            name: np.array(
+                [_sample(record.get(name)) for record in raw], dtype=np.float32
+            )
+            for name in names
+        })
+    return document
+
+
+def workout_view(
+    document: Dict[str, Any],
+    points: int = 0,
+    channels: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Get workout details for a tool response, with samples summarized."""
+    samples = document.get(SAMPLES_KEY)
+    if not isinstance(samples, WorkoutSamples):
+        return document
+    return {**document, SAMPLES_KEY: samples.view(points, channels)}
+
+
+def _sample(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float("nan")
+
+
+def _bucket_means(values: np.ndarray, size: int, buckets: int) -> List[Optional[float]]:
+    padded = np.full(buckets * size, np.nan, dtype=np.float64)
+    padded[:len(values)] = values
+    blocks = padded.reshape(buckets, size)
+    valid = ~np.isnan(blocks)
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, blocks, 0.0).sum(axis=1)
+    means = np.divide(sums, counts, out=np.full(buckets, np.nan), where=counts > 0)
+    return [None if np.isnan(v) else v for v in np.round(means, 1).tolist()]
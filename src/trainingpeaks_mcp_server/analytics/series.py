@@ -0,0 +1,246 @@
+"""Aggregation, rolling baselines and downsampling for metric time series."""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Keys under which the API reports a metric's timestamp and value
+METRIC_DATE_KEYS = ("date", "Date", "timestamp", "timeStamp", "recordedAt", "day")
+METRIC_VALUE_KEYS = ("value", "Value")
+
+# Rows a summarized series is downsampled to when no ``max_points`` is given
+DEFAULT_MAX_POINTS = 500
+
+
+def metric_points(
+    metrics: Iterable[Dict[str, Any]],
+    metric_type: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Extract sorted ``datetime64[D]`` dates and float values from metric records.
+
+    The value is read from ``value`` or, failing that, from a key named after
+    the metric type (e.g. ``hrv``). Records without a date or numeric value
+    are skipped.
+    """
+    value_keys = METRIC_VALUE_KEYS + ((metric_type,) if metric_type else ())
+    dates: List[str] = []
+    values: List[float] = []
+    for record in metrics:
+        day = next((record[k] for k in METRIC_DATE_KEYS if record.get(k)), None)
+        value = next((record[k] for k in value_keys if record.get(k) is not None), None)
+        if day is None or value is None:
+            continue
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            continue
+        dates.append(str(day)[:10])
+    days = np.array(dates, dtype="datetime64[D]")
+    order = np.argsort(days, kind="stable")
+    return days[order], np.array(values, dtype=np.float64)[order]
+
+
+def bucket_starts(days: np.ndarray, period: str) -> np.ndarray:
+    """Map each day to the first day of its daily, weekly or monthly bucket."""
+    if period == "daily":
+        return days
+    if period == "weekly":
+        # 1970-01-01 was a Thursday, so shift by 3 days to start weeks on Monday
+        offsets = days.astype(np.int64)
+        return ((offsets + 3) // 7 * 7 - 3).astype("datetime64[D]")
+    if period == "monthly":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Unknown period: {period}")
+
+
+def aggregate(
+    days: np.ndarray,
+    values: np.ndarray,
+    period: str,
+    percentiles: Sequence[float] = ()
+) -> Dict[str, np.ndarray]:
+    """Compute count, mean, min, max and percentiles per bucket.
+
+    Values are sorted within buckets once, so every percentile is a
+    vectorized linear interpolation between neighbouring ranks.
+    """
+    buckets = bucket_starts(days, period)
+    order = np.lexsort((values, buckets))
+    buckets, values = buckets[order], values[order]
+    starts, index, counts = np.unique(buckets, return_index=True, return_counts=True)
+    if not len(starts):
+        empty = np.zeros(0)
+        result = {
+            "date": starts,
+            "count": counts,
+            "mean": empty,
+            "min": empty,
+            "max": empty,
+        }
+        result.update({_percentile_name(p): empty for p in percentiles})
+        return result
+
+    sums = np.add.reduceat(values, index)
+    result = {
+        "date": starts,
+        "count": counts,
+        "mean": sums / counts,
+        "min": values[index],
+        "max": values[index + counts - 1],
+    }
+    for p in percentiles:
+        rank = index + (p / 100.0) * (counts - 1)
+        lower = np.floor(rank).astype(np.int64)
+        upper = np.minimum(lower + 1, index + counts - 1)
+        fraction = rank - lower
+        result[_percentile_name(p)] = (
+            values[lower] * (1 - fraction) + values[upper] * fraction
+        )
+    return result
+
+
+def rolling_baseline(
+    days: np.ndarray,
+    values: np.ndarray,
+    window_days: int,
+    at: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the trailing ``window_days`` mean and standard deviation at ``at``.
+
+    Uses cumulative sums over a daily grid, so each lookup is O(1).
+    """
+    if not len(days) or not len(at):
+        return np.full(len(at), np.nan), np.full(len(at), np.nan)
+    first = days.min()
+    last = max(days.max(), at.max())
+    size = int((last - first).astype(np.int64)) + 1
+    offsets = (days - first).astype(np.int64)
+    sums = np.concatenate([[0.0], np.cumsum(np.bincount(offsets, values, size))])
+    squares = np.concatenate(
+        [[0.0], np.cumsum(np.bincount(offsets, values ** 2, size))]
+    )
+    counts = np.concatenate([[0], np.cumsum(np.bincount(offsets, minlength=size))])
+
+    end = np.clip((at - first).astype(np.int64) + 1, 0, size)
+    start = np.clip(end - window_days, 0, size)
+    n = counts[end] - counts[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (sums[end] - sums[start]) / n
+        variance = (squares[end] - squares[start]) / n - mean ** 2
+    return mean, np.sqrt(np.maximum(variance, 0.0))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Pick ``threshold`` indexes that preserve the series' shape (LTTB).
+
+    Buckets are processed in order because each choice depends on the last
+    one; the triangle areas within a bucket are computed vectorized.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def summarize_metrics(
+    metrics: Iterable[Dict[str, Any]],
+    metric_type: str,
+    period: Optional[str] = None,
+    percentiles: Sequence[float] = (),
+    baseline_days: Optional[int] = None,
+    max_points: Optional[int] = None
+) -> Dict[str, Any]:
+    """Reduce raw metric records to a compact, bounded-size columnar response.
+
+    Without ``period`` the raw points are kept (one row per record); with it,
+    rows are buckets. Rows beyond ``max_points`` (``DEFAULT_MAX_POINTS`` when
+    not given) are downsampled with LTTB, so the size stays bounded however
+    long the date range.
+    """
+    max_points = max_points or DEFAULT_MAX_POINTS
+    days, values = metric_points(metrics, metric_type)
+    if period:
+        columns = aggregate(days, values, period, percentiles)
+        trend = columns["mean"]
+    else:
+        columns = {"date": days, "value": values}
+        trend = values
+
+    if baseline_days and len(columns["date"]):
+        # Baselines are read at the end of each row's bucket
+        at = columns["date"] + (_bucket_length(columns["date"], period) - 1)
+        columns["baseline"], columns["baseline_sd"] = rolling_baseline(
+            days, values, baseline_days, at
+        )
+
+    if len(trend) > max_points:
+        keep = lttb(columns["date"].astype(np.int64), trend, max_points)
+        columns = {name: column[keep] for name, column in columns.items()}
+
+    result: Dict[str, Any] = {
+        "metric_type": metric_type,
+        "period": period or "raw",
+        "summary": _summary(days, values),
+        "series": {name: _to_list(column) for name, column in columns.items()},
+    }
+    return result
+
+
+def _bucket_length(starts: np.ndarray, period: Optional[str]) -> np.ndarray:
+    if period == "weekly":
+        return np.full(len(starts), 7, dtype=np.int64)
+    if period == "monthly":
+        months = starts.astype("datetime64[M]")
+        lengths: np.ndarray = (months + 1).astype("datetime64[D]") - starts
+        return lengths.astype(np.int64)
+    return np.ones(len(starts), dtype=np.int64)
+
+
+def _summary(days: np.ndarray, values: np.ndarray) -> Dict[str, Any]:
+    if not len(values):
+        return {"count": 0}
+    return {
+        "count": int(len(values)),
+        "first_date": str(days[0]),
+        "last_date": str(days[-1]),
+        "latest": _round(values[-1]),
+        "mean": _round(values.mean()),
+        "min": _round(values.min()),
+        "max": _round(values.max()),
+        "sd": _round(values.std()),
+    }
+
+
+def _percentile_name(p: float) -> str:
+    return f"p{p:g}"
+
+
+def _round(value: Any) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 2)
+
+
+def _to_list(column: np.ndarray) -> List[Any]:
+    if np.issubdtype(column.dtype, np.datetime64):
+        return [str(day) for day in column]
+    if np.issubdtype(column.dtype, np.integer):
+        return list(column.tolist())
+    rounded = np.round(column.astype(np.float64), 2)
+    return [None if np.isnan(v) else v for v in rounded.tolist()]
@@ -0,0 +1,128 @@
+"""Planned versus completed training for one week."""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from ..dates import format_date, parse_date, workout_date, workout_id
+from .pmc import workout_tss
+
+# Keys under which the API reports planned load and duration (hours)
+PLANNED_TSS_KEYS = ("tssPlanned", "TssPlanned", "plannedTss")
+PLANNED_TIME_KEYS = ("totalTimePlanned", "TotalTimePlanned", "plannedDuration")
+TIME_KEYS = ("totalTime", "TotalTime", "duration")
+SPORT_KEYS = ("workoutType", "WorkoutType", "sport", "type")
+
+
+def week_bounds(day: date) -> Tuple[date, date]:
+    """Get the Monday and Sunday of the week containing ``day``."""
+    monday = day - timedelta(days=day.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def weekly_summary(
+    completed: Iterable[Dict[str, Any]],
+    planned: Iterable[Dict[str, Any]],
+    week_start: date,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """Compare planned and completed workouts for the week starting ``week_start``.
+
+    ``completed`` are workouts already on the calendar (done or missed);
+    ``planned`` are upcoming planned workouts. A day's planned load counts
+    from the completed workout's planned fields when present, so a workout
+    is not counted twice once it has been done.
+    """
+    today = today or date.today()
+    week_end = week_start + timedelta(days=6)
+    done = {"workouts": 0, "tss": 0.0, "hours": 0.0}
+    plan = {"workouts": 0, "tss": 0.0, "hours": 0.0}
+    missed = 0
+    by_sport: Dict[str, Dict[str, float]] = {}
+    seen_ids: Set[str] = set()
+
+    for workout in completed:
+        day = _day(workout, week_start, week_end)
+        if day is None:
+            continue
+        tss = workout_tss(workout)
+        hours = _number(workout, TIME_KEYS)
+        planned_tss = _number(workout, PLANNED_TSS_KEYS)
+        planned_hours = _number(workout, PLANNED_TIME_KEYS)
+        if planned_tss or planned_hours:
+            plan["workouts"] += 1
+            plan["tss"] += planned_tss
+            plan["hours"] += planned_hours
+        if tss or hours:
+            done["workouts"] += 1
+            done["tss"] += tss
+            done["hours"] += hours
+            sport = workout_sport(workout)
+            totals = by_sport.setdefault(
+                sport, {"workouts": 0, "tss": 0.0, "hours": 0.0}
+            )
+            totals["workouts"] += 1
+            totals["tss"] += tss
+            totals["hours"] += hours
+        elif day < today:
+            missed += 1
+        identifier = workout_id(workout)
+        if identifier is not None:
+            seen_ids.add(identifier)
+
+    for workout in planned:
+        day = _day(workout, week_start, week_end)
+        if day is None or day < today or workout_id(workout) in seen_ids:
+            continue
+        plan["workouts"] += 1
+        plan["tss"] += _number(workout, PLANNED_TSS_KEYS) or workout_tss(workout)
+        plan["hours"] += (
+            _number(workout, PLANNED_TIME_KEYS) or _number(workout, TIME_KEYS)
+        )
+
+    return {
+        "week_start": format_date(week_start),
+        "week_end": format_date(week_end),
+        "planned": _rounded(plan),
+        "completed": _rounded(done),
+        "missed_workouts": missed,
+        "tss_compliance": (
+            round(done["tss"] / plan["tss"], 2) if plan["tss"] else None
+        ),
+        "by_sport": {
+            sport: _rounded(totals) for sport, totals in sorted(by_sport.items())
+        },
+    }
+
+
+def _day(workout: Dict[str, Any], start: date, end: date) -> Optional[date]:
+    value = workout_date(workout)
+    if value is None:
+        return None
+    day = parse_date(value)
+    return day if start <= day <= end else None
+
+
+def _number(workout: Dict[str, Any], keys: Tuple[str, ...]) -> float:
+    for key in keys:
+        value = workout.get(key)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return 0.0
+    return 0.0
+
+
+def workout_sport(workout: Dict[str, Any]) -> str:
+    """Get a workout's type (Bike, Run, ...), or "Other" if it has none."""
+    for key in SPORT_KEYS:
+        if workout.get(key):
+            return str(workout[key])
+    return "Other"
+
+
+def _rounded(totals: Dict[str, float]) -> Dict[str, Any]:
+    return {
+        "workouts": int(totals["workouts"]),
+        "tss": round(totals["tss"], 1),
+        "hours": round(totals["hours"], 2),
+    }
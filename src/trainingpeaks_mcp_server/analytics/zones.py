@@ -0,0 +1,205 @@
+"""Time in heart rate, power and pace zones across workouts."""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..dates import format_date, parse_date
+from ..store import WorkoutStore
+from .samples import WorkoutSamples
+from .weekly import week_bounds
+
+# Keys under which the zones endpoint may report each sample channel's zones.
+# Pace zones are speed bounds in m/s, matching the ``speed`` channel.
+ZONE_KEYS = {
+    "heartRate": ("heartRate", "heartRateZones", "HeartRateZones", "hr"),
+    "power": ("power", "powerZones", "PowerZones"),
+    "speed": ("speed", "speedZones", "SpeedZones", "pace", "paceZones", "PaceZones"),
+}
+ZONE_MIN_KEYS = ("min", "minimum", "Minimum", "low", "Low")
+ZONE_MAX_KEYS = ("max", "maximum", "Maximum", "high", "High")
+
+# Zone bounds (low, high) by channel, lowest zone first
+Zones = Dict[str, List[Tuple[float, float]]]
+
+
+def parse_zones(document: Dict[str, Any]) -> Zones:
+    """Get each channel's zone bounds from the zones endpoint's response."""
+    zones: Zones = {}
+    for channel, keys in ZONE_KEYS.items():
+        raw = next((document[key] for key in keys if document.get(key)), None)
+        if not isinstance(raw, list):
+            continue
+        bounds = []
+        for zone in raw:
+            if isinstance(zone, dict):
+                low, high = _bound(zone, ZONE_MIN_KEYS), _bound(zone, ZONE_MAX_KEYS)
+            elif isinstance(zone, (list, tuple)) and len(zone) == 2:
+                low, high = _float(zone[0]), _float(zone[1])
+            else:
+                continue
+            if low is not None:
+                bounds.append((low, high if high is not None else float("inf")))
+        if bounds:
+            zones[channel] = sorted(bounds)
+    return zones
+
+
+def zones_hash(zones: Zones) -> str:
+    """Fingerprint zone bounds, so cached times are recomputed when they change."""
+    canonical = json.dumps(
+        {channel: [[low, _upper(high)] for low, high in bounds]
+         for channel, bounds in sorted(zones.items())},
+        sort_keys=True,
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def time_in_zones(samples: WorkoutSamples, zones: Zones) -> Dict[str, List[float]]:
+    """Get seconds spent in each zone, per channel the workout has zones for.
+
+    A sample belongs to the highest zone whose lower bound it reaches;
+    samples below the first zone count towards it, and missing ones are
+    skipped.
+    """
+    result: Dict[str, List[float]] = {}
+    for channel, bounds in zones.items():
+        values = samples.channel(channel)
+        if values is None:
+            continue
+        values = values[~np.isnan(values)]
+        edges = np.array([low for low, _ in bounds[1:]], dtype=np.float32)
+        counts = np.bincount(np.digitize(values, edges), minlength=len(bounds))
+        result[channel] = [round(float(n) * samples.interval, 1) for n in counts]
+    return result
+
+
+class ZoneTimeIndex:
+    """Time-in-zone entries by workout ID, valid for one set of zone bounds.
+
+    Entries persist in the workout store when there is one, otherwise in
+    memory. Entries computed against other zones are never returned, and
+    are dropped as soon as entries for new zones are saved.
+    """
+
+    def __init__(self, store: Optional[WorkoutStore] = None):
+        self.store = store
+        self._hash: Optional[str] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def get(
+        self,
+        workout_ids: Sequence[str],
+        zones_hash: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get the entries computed against ``zones_hash``."""
+        if self.store is not None:
+            return self.store.zone_times(workout_ids, zones_hash)
+        if zones_hash != self._hash:
+            return {}
+        return {
+            workout_id: self._entries[workout_id]
+            for workout_id in workout_ids
+            if workout_id in self._entries
+        }
+
+    def add(self, zones_hash: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Record entries (``day``, ``sport`` and seconds per zone by channel)."""
+        if self.store is not None:
+            self.store.save_zone_times(zones_hash, entries)
+            return
+        if zones_hash != self._hash:
+            self._hash = zones_hash
+            self._entries = {}
+        self._entries.update(entries)
+
+
+def distribution(
+    entries: Iterable[Dict[str, Any]],
+    zones: Zones,
+    group_by: str = "week"
+) -> Dict[str, Any]:
+    """Total time in zones per week, sport or workout, plus overall.
+
+    Each group reports per channel the hours and share of time in each zone.
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    total: Dict[str, Any] = {"workouts": 0}
+    for entry in entries:
+        targets = [total]
+        key = _group_key(entry, group_by)
+        if key is not None:
+            targets.append(groups.setdefault(key, {"workouts": 0}))
+        for target in targets:
+            target["workouts"] += 1
+            for channel, bounds in zones.items():
+                seconds = entry.get(channel)
+                if seconds is None:
+                    continue
+                sums = target.setdefault(channel, np.zeros(len(bounds)))
+                sums[:len(seconds)] += seconds[:len(bounds)]
+
+    def rendered(totals: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"workouts": totals["workouts"]}
+        for channel in zones:
+            sums = totals.get(channel)
+            if sums is None:
+                continue
+            overall = sums.sum()
+            result[channel] = {
+                "hours": np.round(sums / 3600.0, 2).tolist(),
+                "percent": (
+                    np.round(sums * 100.0 / overall, 1).tolist()
+                    if overall else [0.0] * len(sums)
+                ),
+            }
+        return result
+
+    result: Dict[str, Any] = {
+        "zones": {
+            channel: [
+                {"zone": i + 1, "min": low, "max": _upper(high)}
+                for i, (low, high) in enumerate(bounds)
+            ]
+            for channel, bounds in zones.items()
+        },
+        "total": rendered(total),
+    }
+    if group_by != "total":
+        result["group_by"] = group_by
+        result["groups"] = [
+            {group_by: key, **rendered(totals)}
+            for key, totals in sorted(groups.items())
+        ]
+    return result
+
+
+def _group_key(entry: Dict[str, Any], group_by: str) -> Optional[str]:
+    if group_by == "week":
+        day = entry.get("day")
+        if not day:
+            return "unknown"
+        return format_date(week_bounds(parse_date(day))[0])
+    if group_by == "sport":
+        return entry.get("sport") or "Other"
+    if group_by == "workout":
+        return entry.get("workout_id")
+    return None
+
+
+def _bound(zone: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[float]:
+    for key in keys:
+        if key in zone:
+            return _float(zone[key])
+    return None
+
+
+def _upper(high: float) -> Optional[float]:
+    return None if high == float("inf") else high
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,216 @@
+"""Per-athlete auth and API clients for coaches managing several athletes."""
+
+import asyncio
+import re
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+from .auth import TrainingPeaksAuth
+from .client import TrainingPeaksClient
+from .config import TrainingPeaksConfig
+from .http_client import SharedHTTPClient
+from .instrumentation import Metrics
+from .prefetch import PrefetchScheduler
+
+if TYPE_CHECKING:
+    from .analytics.curves import CurveIndex
+    from .analytics.pmc import PMCEngine
+    from .analytics.zones import ZoneTimeIndex
+
+DEFAULT_ATHLETE = "default"
+
+# Selector that fans a tool call out to every known athlete
+ALL_ATHLETES = "all"
+
+ATHLETE_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+class AthleteContext:
+    """Tokens, API client, workout store and analytics for one athlete."""
+
+    def __init__(
+        self,
+        athlete_id: str,
+        auth: TrainingPeaksAuth,
+        client: TrainingPeaksClient,
+        prefetch: Optional[PrefetchScheduler] = None
+    ):
+        self.athlete_id = athlete_id
+        self.auth = auth
+        self.client = client
+        self.prefetch = prefetch
+        self._pmc: Optional["PMCEngine"] = None
+        self._curves: Optional["CurveIndex"] = None
+        self._zone_times: Optional["ZoneTimeIndex"] = None
+
+    @property
+    def pmc(self) -> "PMCEngine":
+        """Get the athlete's Performance Management Chart engine."""
+        if self._pmc is None:
+            from .analytics.pmc import PMCEngine
+
+            self._pmc = PMCEngine()
+        return self._pmc
+
+    @property
+    def curves(self) -> "CurveIndex":
+        """Get the athlete's index of per-workout mean-maximal curves."""
+        if self._curves is None:
+            from .analytics.curves import CurveIndex
+
+            self._curves = CurveIndex(self.client.store)
+        return self._curves
+
+    @property
+    def zone_times(self) -> "ZoneTimeIndex":
+        """Get the athlete's index of per-workout time in zones."""
+        if self._zone_times is None:
+            from .analytics.zones import ZoneTimeIndex
+
+            self._zone_times = ZoneTimeIndex(self.client.store)
+        return self._zone_times
+
+    def reset(self) -> None:
+        """Drop cached responses and analytics, e.g. after new tokens."""
+        self.client.invalidate_cache()
+        self._pmc = None
+        self._curves = None
+        self._zone_times = None
+        if self.prefetch is not None:
+            self.prefetch.wake()
+
+    async def aclose(self) -> None:
+        """Stop background work for this athlete."""
+        if self.prefetch is not None:
+            await self.prefetch.aclose()
+        await self.client.aclose()
+        await self.auth.aclose()
+
+
+class AthleteRegistry:
+    """Create athlete contexts on demand and fan calls out across them.
+
+    The default athlete uses the configured token and workout store paths.
+    Every other athlete keeps them under ``athletes_dir/<athlete_id>/``, so
+    athletes are known across restarts once their tokens have been set. All
+    contexts share one connection pool and one metrics registry.
+    """
+
+    def __init__(self, http: SharedHTTPClient, metrics: Optional[Metrics] = None):
+        self.http = http
+        self.config = http.config
+        self.metrics = metrics or Metrics()
+        self._contexts: Dict[str, AthleteContext] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def default(self) -> AthleteContext:
+        """Get the context of the default (single-athlete mode) athlete."""
+        return self.get(DEFAULT_ATHLETE)
+
+    def get(self, athlete_id: Optional[str] = None) -> AthleteContext:
+        """Get an athlete's context, creating it on first use."""
+        athlete_id = athlete_id or DEFAULT_ATHLETE
+        context = self._contexts.get(athlete_id)
+        if context is None:
+            config = self._athlete_config(athlete_id)
+            auth = TrainingPeaksAuth(config=config, http=self.http)
+            client = TrainingPeaksClient(auth, metrics=self.metrics)
+            prefetch = (
+                PrefetchScheduler(
+                    client,
+                    interval=config.prefetch_interval,
+                    jitter=config.prefetch_jitter,
+                    days=config.prefetch_days,
+                )
+                if config.prefetch_enabled else None
+            )
+            context = self._contexts[athlete_id] = AthleteContext(
+                athlete_id, auth, client, prefetch
+            )
+            auth.start_background_refresh()
+            if prefetch is not None:
+                prefetch.start()
+        return context
+
+    def _athlete_config(self, athlete_id: str) -> TrainingPeaksConfig:
+        if athlete_id == DEFAULT_ATHLETE:
+            return self.config
+        if not ATHLETE_ID_PATTERN.match(athlete_id) or athlete_id == ALL_ATHLETES:
+            raise ValueError(f"Invalid athlete ID: {athlete_id!r}")
+        if not self.config.athletes_dir:
+            raise ValueError(
+                "Coach mode is disabled (TRAININGPEAKS_ATHLETES_DIR is empty)"
+            )
+        directory = Path(self.config.athletes_dir).expanduser() / athlete_id
+        store = directory / "workouts.db" if self.config.workout_store_path else None
+        return self.config.model_copy(update={
+            "token_store_path": str(directory / "tokens.json"),
+            "workout_store_path": str(store) if store is not None else None,
+        })
+
+    def athlete_ids(self) -> List[str]:
+        """Get the athletes with stored tokens or an active context, sorted."""
+        ids = {
+            athlete_id for athlete_id, context in self._contexts.items()
+            if athlete_id != DEFAULT_ATHLETE or context.auth.access_token
+        }
+        if self.config.athletes_dir:
+            directory = Path(self.config.athletes_dir).expanduser()
+            if directory.is_dir():
+                ids.update(
+                    path.parent.name for path in directory.glob("*/tokens.json")
+                    if ATHLETE_ID_PATTERN.match(path.parent.name)
+                )
+        return sorted(ids)
+
+    async def fan_out(
+        self,
+        athlete_ids: Iterable[str],
+        call: Callable[[AthleteContext], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        """Run ``call`` for several athletes concurrently under the global limit.
+
+        Returns ``{"athletes": {id: result}, "errors": {id: message}}`` so one
+        failing athlete does not fail the whole query.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.config.coach_concurrency)
+        semaphore = self._semaphore
+
+        async def run(athlete_id: str) -> Any:
+            async with semaphore:
+                return await call(self.get(athlete_id))
+
+        ids = list(dict.fromkeys(athlete_ids))
+        results = await asyncio.gather(
+            *(run(athlete_id) for athlete_id in ids),
+            return_exceptions=True
+        )
+        merged: Dict[str, Any] = {"athletes": {}, "errors": {}}
+        for athlete_id, result in zip(ids, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception):
+                merged["errors"][athlete_id] = str(result) or type(result).__name__
+            else:
+                merged["athletes"][athlete_id] = result
+        return merged
+
+    def contexts(self) -> List[AthleteContext]:
+        """Get the contexts created so far."""
+        return list(self._contexts.values())
+
+    async def aclose(self) -> None:
+        """Stop background work for every athlete."""
+        for context in self._contexts.values():
+            await context.aclose()
+        self._contexts.clear()
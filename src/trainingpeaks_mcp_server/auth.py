@@ -1,20 +1,42 @@
 """OAuth authentication for TrainingPeaks API."""
 
+import asyncio
+import logging
 import time
 from typing import Optional, Dict, Any
 from urllib.parse import urlencode
 import httpx
-from .config import get_config
+from .config import TrainingPeaksConfig, get_config
+from .http_client import SharedHTTPClient
+from .token_store import TokenStore
+
+logger = logging.getLogger(__name__)
+
+# Delay before retrying a failed background refresh
+REFRESH_RETRY_DELAY = 30.0
 
 
 class TrainingPeaksAuth:
     """Handle OAuth authentication with TrainingPeaks API."""
     
-    def __init__(self):
-        self.config = get_config()
+    def __init__(
+        self,
+        config: Optional[TrainingPeaksConfig] = None,
+        http: Optional[SharedHTTPClient] = None
+    ):
+        self.config = config or get_config()
+        self.http = http or SharedHTTPClient(self.config)
         self.access_token: Optional[str] = None
         self.refresh_token: Optional[str] = None
         self.expires_at: Optional[float] = None
+        self.token_store = (
+            TokenStore(self.config.token_store_path)
+            if self.config.token_store_path else None
+        )
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+        self._background_task: Optional["asyncio.Task[None]"] = None
+        self._persist_task: Optional["asyncio.Task[None]"] = None
+        self._load_stored_tokens()
     
     def get_authorization_url(self, state: Optional[str] = None) -> str:
         """Generate the authorization URL for OAuth flow."""
@@ -39,13 +61,12 @@ class TrainingPeaksAuth:
             "redirect_uri": self.config.redirect_uri,
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.config.token_url, data=data)
-            response.raise_for_status()
-            token_data = response.json()
-            
-            self._store_token_data(token_data)
-            return token_data
+        response = await self.http.client.post(self.config.token_url, data=data)
+        response.raise_for_status()
+        token_data = response.json()
+        
+        self._store_token_data(token_data)
+        return token_data
     
     async def refresh_access_token(self) -> Dict[str, Any]:
         """Refresh the access token using refresh token."""
@@ -59,44 +80,222 @@ class TrainingPeaksAuth:
             "refresh_token": self.refresh_token,
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.config.token_url, data=data)
-            response.raise_for_status()
-            token_data = response.json()
-            
-            self._store_token_data(token_data)
-            return token_data
+        response = await self.http.client.post(self.config.token_url, data=data)
+        response.raise_for_status()
+        token_data = response.json()
+        
+        self._store_token_data(token_data)
+        return token_data
     
     def _store_token_data(self, token_data: Dict[str, Any]) -> None:
         """Store token data from API response."""
         self.access_token = token_data.get("access_token")
-        self.refresh_token = token_data.get("refresh_token")
+        self.refresh_token = token_data.get("refresh_token", self.refresh_token)
         
         expires_in = token_data.get("expires_in")
         if expires_in:
             self.expires_at = time.time() + expires_in
+        
+        self._persist_tokens()
+        self.start_background_refresh(reschedule=True)
+    
+    def _persist_tokens(self) -> None:
+        """Write the current tokens to the token store, if one is configured."""
+        if self.token_store is None:
+            return
+        try:
+            self.token_store.save({
+                "access_token": self.access_token,
+                "refresh_token": self.refresh_token,
+                "expires_at": self.expires_at,
+            })
+        except OSError as e:
+            logger.warning("Could not persist tokens to %s: %s", self.token_store.path, e)
+    
+    def _load_stored_tokens(self) -> bool:
+        """Adopt tokens from the token store; return True if they were newer."""
+        if self.token_store is None:
+            return False
+        data = self.token_store.load()
+        if not data or not data.get("access_token"):
+            return False
+        if data.get("access_token") == self.access_token:
+            return False
+        self.access_token = data.get("access_token")
+        self.refresh_token = data.get("refresh_token")
+        self.expires_at = data.get("expires_at")
+        return True
     
     def is_token_expired(self) -> bool:
         """Check if the current access token is expired."""
         if not self.expires_at:
             return True
-        return time.time() >= self.expires_at - 300  # 5 minute buffer
+        return time.time() >= self.expires_at - self.config.token_refresh_buffer
+    
+    def has_tokens(self) -> bool:
+        """Check whether a token is available or can be refreshed."""
+        if self.token_store is not None and self.token_store.has_changed():
+            self._load_stored_tokens()
+        return bool(self.access_token or self.refresh_token)
     
     async def get_valid_token(self) -> str:
         """Get a valid access token, refreshing if necessary."""
+        if self.token_store is not None and self.token_store.has_changed():
+            self._load_stored_tokens()
+        
         if not self.access_token or self.is_token_expired():
             if self.refresh_token:
-                await self.refresh_access_token()
+                await self._refresh_single_flight()
             else:
                 raise ValueError("No valid token available. Please re-authenticate.")
         
         if not self.access_token:
             raise ValueError("Failed to obtain valid access token")
         
+        self.start_background_refresh()
         return self.access_token
     
+    async def _refresh_single_flight(self) -> None:
+        """Refresh the token, sharing one in-flight refresh between callers."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh_locked())
+        # Shield so that a cancelled caller does not abort the shared refresh
+        await asyncio.shield(self._refresh_task)
+    
+    async def _refresh_locked(self) -> None:
+        """Refresh under the token store lock, reusing a peer process's refresh."""
+        if self.token_store is None:
+            await self.refresh_access_token()
+            return
+        
+        store = self.token_store
+        fd = await self._acquire_store_lock(store)
+        try:
+            # Another process may have refreshed while we waited for the lock
+            if self._load_stored_tokens() and not self.is_token_expired():
+                return
+            await self.refresh_access_token()
+        finally:
+            store.release(fd)
+    
+    @staticmethod
+    async def _acquire_store_lock(store: TokenStore) -> int:
+        """Take the token store lock in a worker thread so the event loop never blocks."""
+        acquiring = asyncio.get_running_loop().run_in_executor(None, store.acquire)
+        try:
+            return await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The executor thread still takes the lock; release it once it does
+            acquiring.add_done_callback(
+                lambda f: store.release(f.result())
+                if not f.cancelled() and f.exception() is None else None
+            )
+            raise
+    
+    async def _persist_locked(self) -> None:
+        """Write the current tokens under the token store lock."""
+        store = self.token_store
+        if store is None:
+            return
+        fd = await self._acquire_store_lock(store)
+        try:
+            self._persist_tokens()
+        finally:
+            store.release(fd)
+    
+    def start_background_refresh(self, reschedule: bool = False) -> None:
+        """Start the proactive refresh loop if an event loop is running.
+        
+        With ``reschedule`` a sleeping loop is restarted so it picks up a
+        changed expiry time.
+        """
+        if not self.refresh_token:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._background_task
+        if task is not None and not task.done():
+            if not reschedule or task is asyncio.current_task():
+                return
+            task.cancel()
+        self._background_task = asyncio.ensure_future(self._background_refresh())
+    
+    async def _background_refresh(self) -> None:
+        """Refresh tokens ahead of the expiry buffer so callers never wait."""
+        lead = self.config.token_refresh_buffer + self.config.token_refresh_lead
+        while self.refresh_token and self.expires_at:
+            delay = self.expires_at - lead - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self._refresh_single_flight()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code < 500:
+                    logger.error("Background token refresh rejected: %s", e)
+                    return
+                logger.warning("Background token refresh failed: %s", e)
+                await asyncio.sleep(REFRESH_RETRY_DELAY)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Background token refresh failed: %s", e)
+                await asyncio.sleep(REFRESH_RETRY_DELAY)
+    
     def set_tokens(self, access_token: str, refresh_token: str, expires_in: int) -> None:
-        """Manually set token data."""
+        """Manually set token data.
+        
+        Inside a running event loop the tokens are persisted in the background,
+        since the token store lock may be held by a refresh or another process.
+        """
         self.access_token = access_token
         self.refresh_token = refresh_token
-        self.expires_at = time.time() + expires_in
\ No newline at end of file
+        self.expires_at = time.time() + expires_in
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self.token_store is not None:
+                with self.token_store.lock():
+                    self._persist_tokens()
+        else:
+            if self.token_store is not None:
+                self._persist_task = asyncio.ensure_future(self._persist_locked())
+        self.start_background_refresh(reschedule=True)
+    
+    async def update_tokens(self, access_token: str, refresh_token: str, expires_in: int) -> None:
+        """Set and persist token data without blocking the event loop.
+        
+        An in-flight refresh is awaited first, so it cannot overwrite the new
+        tokens with ones obtained from the old refresh token.
+        """
+        task = self._refresh_task
+        if task is not None and not task.done():
+            try:
+                await asyncio.shield(task)
+            except Exception as e:
+                logger.debug("Refresh in flight while setting tokens failed: %s", e)
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = time.time() + expires_in
+        await self._persist_locked()
+        self.start_background_refresh(reschedule=True)
+    
+    async def aclose(self) -> None:
+        """Stop background token refresh."""
+        if self._persist_task is not None:
+            # Let a pending write finish rather than lose the tokens
+            try:
+                await self._persist_task
+            except Exception as e:
+                logger.warning("Could not persist tokens: %s", e)
+        for task in (self._background_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._background_task = None
+        self._refresh_task = None
+        self._persist_task = None
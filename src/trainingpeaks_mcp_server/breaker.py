@@ -0,0 +1,224 @@
+"""Circuit breaking and hedging for TrainingPeaks API requests."""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Recent request latencies kept per endpoint class for the hedge delay
+LATENCY_WINDOW = 200
+
+# Cached responses served past their stale window during the current tool call
+_stale_reads: ContextVar[Optional[List[str]]] = ContextVar("stale_reads", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while an endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"TrainingPeaks API is failing for {endpoint} requests; "
+            f"not retrying for {max(1.0, retry_in):.0f}s"
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class EndpointBreaker:
+    """Circuit breaker for one endpoint class.
+
+    Closed, it lets every request through and tracks the outcome of the last
+    ``window`` requests; 5xx responses, transport errors and calls slower
+    than ``slow_call`` count as failures. Once ``min_requests`` outcomes are
+    known and the failure ratio reaches ``failure_ratio`` it opens, failing
+    requests fast for ``open_seconds``. It then half-opens: one probe request
+    at a time goes through, closing the circuit on success or reopening it
+    on failure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_ratio: float = 0.5,
+        min_requests: int = 10,
+        window: int = 20,
+        slow_call: float = 10.0,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, window))
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._probing = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Admit one request, raising ``CircuitOpenError`` if it must fail fast."""
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.open_seconds - time.monotonic()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = HALF_OPEN
+        probe = self.state == HALF_OPEN
+        if probe:
+            if self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0)
+            self._probing = True
+        try:
+            yield
+        finally:
+            # A probe cancelled before its outcome was recorded frees the slot
+            if probe:
+                self._probing = False
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Record a request's outcome and its latency in seconds."""
+        ok = ok and latency < self.slow_call
+        if ok:
+            self._latencies.append(latency)
+        if self.state == HALF_OPEN:
+            if ok:
+                self.state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        self._outcomes.append(ok)
+        if ok or self.state != CLOSED:
+            return
+        if len(self._outcomes) >= self.min_requests:
+            failures = self._outcomes.count(False)
+            if failures >= self.failure_ratio * len(self._outcomes):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.opens += 1
+        self._outcomes.clear()
+
+    def latency_quantile(self, q: float, min_samples: int) -> Optional[float]:
+        """Get a quantile of recent successful latencies, if enough are known."""
+        if len(self._latencies) < max(1, min_samples):
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the state, recent failure ratio and counters."""
+        outcomes = len(self._outcomes)
+        return {
+            "state": self.state,
+            "failure_ratio": (
+                round(self._outcomes.count(False) / outcomes, 2) if outcomes else 0.0
+            ),
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """Endpoint-class breakers plus the delay after which GETs are hedged."""
+
+    def __init__(
+        self,
+        failure_ratio: float = 0.5,
+        min_requests: int = 10,
+        window: int = 20,
+        slow_call: float = 10.0,
+        open_seconds: float = 30.0,
+        hedge_quantile: Optional[float] = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 0.05,
+        hedge_median_factor: float = 3.0,
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.window = window
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_median_factor = hedge_median_factor
+        self.breakers: Dict[str, EndpointBreaker] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.stale_served = 0
+
+    def endpoint(self, name: str) -> EndpointBreaker:
+        """Get the breaker for an endpoint class."""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = EndpointBreaker(
+                name,
+                failure_ratio=self.failure_ratio,
+                min_requests=self.min_requests,
+                window=self.window,
+                slow_call=self.slow_call,
+                open_seconds=self.open_seconds,
+            )
+        return breaker
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Get how long to wait before hedging a GET, or None not to hedge.
+
+        The delay is the hedge quantile of recent latencies, but at most
+        ``hedge_median_factor`` times the median: once slow calls make up
+        more than the quantile's tail, the quantile is one of them and
+        hedging would otherwise stop helping.
+        """
+        if self.hedge_quantile is None:
+            return None
+        breaker = self.endpoint(name)
+        quantile = breaker.latency_quantile(
+            self.hedge_quantile, self.hedge_min_samples
+        )
+        median = breaker.latency_quantile(0.5, self.hedge_min_samples)
+        if quantile is None or median is None:
+            return None
+        cap = self.hedge_median_factor * median
+        return max(self.hedge_min_delay, min(quantile, cap))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hedging counters and each endpoint class's breaker state."""
+        return {
+            "open": sum(1 for b in self.breakers.values() if b.state != CLOSED),
+            "rejected": sum(b.rejected for b in self.breakers.values()),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "stale_served": self.stale_served,
+            "endpoints": {name: b.stats() for name, b in sorted(self.breakers.items())},
+        }
+
+
+@contextmanager
+def collect_stale_reads() -> Iterator[List[str]]:
+    """Collect notes about stale cached data served while the block runs."""
+    notes: List[str] = []
+    token = _stale_reads.set(notes)
+    try:
+        yield notes
+    finally:
+        _stale_reads.reset(token)
+
+
+def note_stale_read(note: str) -> None:
+    """Report that stale cached data was served to the current tool call."""
+    notes = _stale_reads.get()
+    if notes is not None and note not in notes:
+        notes.append(note)
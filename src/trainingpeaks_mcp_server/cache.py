@@ -0,0 +1,147 @@
+"""Bounded in-process response cache for slow-changing API endpoints."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheEntry:
+    """A cached response with its freshness and validator metadata."""
+
+    __slots__ = ("value", "etag", "last_modified", "expires_at", "stale_until", "size")
+
+    def __init__(
+        self,
+        value: Any,
+        expires_at: float,
+        stale_until: float,
+        size: int,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Check whether the entry is within its TTL."""
+        return (now if now is not None else time.monotonic()) < self.expires_at
+
+    def is_servable_stale(self, now: Optional[float] = None) -> bool:
+        """Check whether the entry may be served while it is revalidated."""
+        return (now if now is not None else time.monotonic()) < self.stale_until
+
+
+class ResponseCache:
+    """TTL + LRU cache bounded by entry count and approximate byte size.
+
+    Expired entries are kept (until evicted) so their ``ETag`` and
+    ``Last-Modified`` validators can be used for conditional requests.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Look up an entry regardless of freshness and mark it recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        size: int = 0,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store a value for ``ttl`` seconds, servable stale for ``stale_ttl`` more.
+
+        Writes tagged with a ``generation`` older than the current one are
+        dropped, so a response fetched before ``clear()`` cannot repopulate it.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        if size > self.max_bytes:
+            return
+        now = time.monotonic()
+        self._remove(key)
+        self._entries[key] = CacheEntry(
+            value,
+            expires_at=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            size=size,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._bytes += size
+        self._evict()
+
+    def touch(self, key: Hashable, ttl: float, stale_ttl: float = 0.0) -> None:
+        """Extend an entry's lifetime after a ``304 Not Modified`` revalidation."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        now = time.monotonic()
+        entry.expires_at = now + ttl
+        entry.stale_until = now + ttl + stale_ttl
+        self._entries.move_to_end(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry and reject writes from requests already in flight."""
+        self._entries.clear()
+        self._bytes = 0
+        self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counters."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
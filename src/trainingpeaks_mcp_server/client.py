@@ -1,18 +1,432 @@
 """TrainingPeaks API client."""
 
-from typing import Dict, Any, List, Optional
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import date, timedelta
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
 import httpx
 from .auth import TrainingPeaksAuth
-from .config import get_config
+from .breaker import CircuitBreaker, CircuitOpenError, note_stale_read
+from .cache import CacheEntry, ResponseCache
+from .dates import (
+    DateRange,
+    format_date,
+    parse_date,
+    split_range,
+    workout_date,
+    workout_id,
+)
+from .instrumentation import Metrics
+from .ratelimit import RateLimiter, backoff_delay, endpoint_class, parse_retry_after
+from .store import WorkoutStore
+
+if TYPE_CHECKING:
+    from .analytics.samples import SampleStreamParser
+
+logger = logging.getLogger(__name__)
+
+ParserFactory = Callable[[], "SampleStreamParser"]
+
+# Keys under which the profile endpoint reports the athlete's identifier
+ATHLETE_ID_KEYS = ("id", "athleteId", "AthleteId", "Id")
+
+# Workouts of a day range, and the days whose page was truncated
+RangeFetch = Tuple[List[Dict[str, Any]], List[date]]
+
+
+def _workout_sort_key(workout: Dict[str, Any]) -> Tuple[str, str]:
+    return workout_date(workout) or "", workout_id(workout) or ""
 
 
 class TrainingPeaksClient:
     """Client for interacting with TrainingPeaks API."""
     
-    def __init__(self, auth: TrainingPeaksAuth):
+    def __init__(self, auth: TrainingPeaksAuth, metrics: Optional[Metrics] = None):
         self.auth = auth
-        self.config = get_config()
+        self.metrics = metrics or Metrics()
+        self.config = auth.config
+        self.http = auth.http
         self.base_url = self.config.api_base_url
+        self.cache: Optional[ResponseCache] = (
+            ResponseCache(self.config.cache_max_entries, self.config.cache_max_bytes)
+            if self.config.cache_enabled else None
+        )
+        self._revalidations: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.store: Optional[WorkoutStore] = (
+            WorkoutStore(self.config.workout_store_path)
+            if self.config.workout_store_path else None
+        )
+        self._sync_lock: Optional[asyncio.Lock] = None
+        # Bounds workout page requests, including those of split ranges
+        self._fetch_semaphore: Optional[asyncio.Semaphore] = None
+        # Whether the store is known to hold the current tokens' athlete
+        self._store_claimed = False
+        # Unsynced recent windows fetched lately, with their monotonic fetch time
+        self._recent_syncs: Dict[DateRange, float] = {}
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.upstream_requests = 0
+        self.coalesced_requests = 0
+        self.rate_limiter: Optional[RateLimiter] = (
+            RateLimiter(
+                self.config.rate_limit_rates,
+                burst=self.config.rate_limit_burst,
+                initial_concurrency=self.config.initial_concurrency,
+                max_concurrency=self.config.max_concurrency,
+                backoff_base=self.config.retry_backoff_base,
+                backoff_max=self.config.retry_backoff_max,
+            )
+            if self.config.rate_limit_enabled else None
+        )
+        self.breaker: Optional[CircuitBreaker] = (
+            CircuitBreaker(
+                failure_ratio=self.config.breaker_failure_ratio,
+                min_requests=self.config.breaker_min_requests,
+                window=self.config.breaker_window,
+                slow_call=self.config.breaker_slow_call,
+                open_seconds=self.config.breaker_open_seconds,
+                hedge_quantile=(
+                    self.config.hedge_percentile / 100.0
+                    if self.config.hedge_enabled else None
+                ),
+                hedge_min_samples=self.config.hedge_min_samples,
+                hedge_min_delay=self.config.hedge_min_delay,
+                hedge_median_factor=self.config.hedge_median_factor,
+            )
+            if self.config.breaker_enabled else None
+        )
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        sink: Optional["SampleStreamParser"] = None
+    ) -> httpx.Response:
+        """Send an authenticated request and return the raw response.
+        
+        Identical concurrent GETs (same endpoint, params, headers and token)
+        share one upstream request. Each caller awaits it through a shield, so
+        cancelling one caller does not cancel the request for the others.
+        With ``sink``, a successful body is streamed into it instead of being
+        read into the response; such requests are shared one level up, by
+        ``_cached_get``.
+        """
+        if method != "GET" or not self.config.coalesce_requests or sink is not None:
+            return await self._send_with_retries(
+                method,
+                endpoint,
+                params=params,
+                json_data=json_data,
+                headers=headers,
+                sink=sink
+            )
+        
+        token = await self.auth.get_valid_token()
+        key = (
+            endpoint,
+            self._normalize_params(params),
+            tuple(sorted((headers or {}).items())),
+            self._token_digest(token),
+        )
+        response: httpx.Response = await self._coalesce(
+            key,
+            lambda: self._send_with_retries(method, endpoint, params=params, headers=headers)
+        )
+        return response
+    
+    async def _coalesce_parsed(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        parser: Optional[ParserFactory],
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Share one streamed fetch and its parsed result among identical GETs."""
+        if parser is None or not self.config.coalesce_requests:
+            return await fetch()
+        token = await self.auth.get_valid_token()
+        key = ("parsed", endpoint, self._normalize_params(params), self._token_digest(token))
+        return await self._coalesce(key, fetch)
+    
+    async def _coalesce(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once for every concurrent caller with the same key."""
+        future = self._inflight.get(key)
+        if future is None:
+            self.upstream_requests += 1
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight_done(key, f))
+        else:
+            self.coalesced_requests += 1
+        return await asyncio.shield(future)
+    
+    @staticmethod
+    def _token_digest(token: str) -> str:
+        """Fingerprint an access token, so callers with different tokens never share."""
+        return hashlib.sha256(token.encode()).hexdigest()[:16]
+    
+    def _inflight_done(
+        self,
+        key: Hashable,
+        future: "asyncio.Future[Any]"
+    ) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception retrieved in case every waiter was cancelled
+            future.exception()
+    
+    async def _send_with_retries(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        sink: Optional["SampleStreamParser"] = None
+    ) -> httpx.Response:
+        """Send a request, retrying it when that is safe.
+        
+        Requests pass through the rate limiter, when enabled. Idempotent GETs
+        that fail with 429, a 5xx status or a transport error are retried
+        with the server's ``Retry-After`` delay or jittered exponential
+        backoff.
+        """
+        limiter = self.rate_limiter
+        max_retries = self.config.max_retries if method == "GET" else 0
+        
+        def backoff(attempt: int) -> float:
+            return backoff_delay(
+                attempt, self.config.retry_backoff_base, self.config.retry_backoff_max
+            )
+        
+        attempt = 0
+        while True:
+            try:
+                response = await self._send_once(
+                    method,
+                    endpoint,
+                    params=params,
+                    json_data=json_data,
+                    headers=headers,
+                    sink=sink
+                )
+            except httpx.TransportError:
+                if attempt >= max_retries:
+                    raise
+                delay = backoff(attempt)
+            else:
+                if limiter is not None:
+                    retry_after = limiter.observe(
+                        endpoint,
+                        response.status_code,
+                        response.headers
+                    )
+                else:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt >= max_retries:
+                    return response
+                if retry_after is None:
+                    delay = backoff(attempt)
+                elif retry_after <= self.config.retry_backoff_max:
+                    delay = retry_after
+                else:
+                    # Waiting that long would stall the tool call; fail instead
+                    return response
+            
+            if limiter is not None:
+                limiter.retries += 1
+            self.metrics.increment(
+                "upstream_retries_total", endpoint=endpoint_class(endpoint)
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    async def _send_once(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        sink: Optional["SampleStreamParser"] = None
+    ) -> httpx.Response:
+        """Send a single authenticated request under the rate limiter."""
+        token = await self.auth.get_valid_token()
+        request_headers = {"Authorization": f"Bearer {token}"}
+        if headers:
+            request_headers.update(headers)
+        
+        url = f"{self.base_url}{endpoint}"
+        
+        if self.rate_limiter is None:
+            return await self._timed_request(
+                method, endpoint, url, request_headers, params, json_data, sink
+            )
+        async with self.rate_limiter.slot(endpoint):
+            return await self._timed_request(
+                method, endpoint, url, request_headers, params, json_data, sink
+            )
+    
+    async def _timed_request(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        sink: Optional["SampleStreamParser"] = None
+    ) -> httpx.Response:
+        """Send one HTTP request, recording its latency, status and size.
+        
+        With ``sink``, a successful body is fed to it as it arrives. With the
+        circuit breaker enabled, the request fails fast with
+        ``CircuitOpenError`` while the endpoint's circuit is open, and its
+        outcome and time to response headers feed the breaker.
+        """
+        name = endpoint_class(endpoint)
+        breaker = self.breaker.endpoint(name) if self.breaker is not None else None
+        with breaker.guard() if breaker is not None else nullcontext():
+            start = time.perf_counter()
+            with self.metrics.span("trainingpeaks.request", method=method, endpoint=name):
+                try:
+                    response = await self._open_response(
+                        method, name, url, headers, params, json_data
+                    )
+                    latency = time.perf_counter() - start
+                    try:
+                        if sink is None or not response.is_success:
+                            received = len(await response.aread())
+                        else:
+                            sink.reset()
+                            async for chunk in response.aiter_bytes():
+                                sink.feed(chunk)
+                            received = sink.received
+                    finally:
+                        await response.aclose()
+                except httpx.TransportError as e:
+                    if breaker is not None:
+                        breaker.record(False, time.perf_counter() - start)
+                    self.metrics.record_request(
+                        name, time.perf_counter() - start, type(e).__name__
+                    )
+                    raise
+            if breaker is not None:
+                breaker.record(response.status_code < 500, latency)
+        self.metrics.record_request(
+            name,
+            time.perf_counter() - start,
+            str(response.status_code),
+            bytes_sent=len(response.request.content),
+            bytes_received=received
+        )
+        return response
+    
+    async def _open_response(
+        self,
+        method: str,
+        name: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]]
+    ) -> httpx.Response:
+        """Send a request and return as soon as its response headers arrive.
+        
+        A GET still unanswered after its endpoint's hedge delay (a high
+        percentile of recent latencies, capped at a multiple of the median)
+        is sent again, if the rate limiter has a token and a concurrency slot
+        free for it right away; the hedge holds them until its response
+        headers arrive. The first successful response wins and the other
+        request is cancelled. A 429 or 5xx response only wins if the other
+        request fails too.
+        """
+        client = self.http.client
+        
+        def send() -> "asyncio.Future[httpx.Response]":
+            request = client.build_request(
+                method, url, headers=headers, params=params, json=json_data
+            )
+            return asyncio.ensure_future(client.send(request, stream=True))
+        
+        delay = None
+        if method == "GET" and self.breaker is not None:
+            delay = self.breaker.hedge_delay(name)
+        if delay is None:
+            return await send()
+        
+        assert self.breaker is not None
+        tasks = [send()]
+        winner: Optional["asyncio.Future[httpx.Response]"] = None
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            limiter = self.rate_limiter
+            if not done and (limiter is None or limiter.try_acquire(name)):
+                self.breaker.hedged += 1
+                self.metrics.increment("upstream_hedges_total", endpoint=name)
+                hedge = send()
+                if limiter is not None:
+                    hedge.add_done_callback(lambda _: limiter.release())
+                tasks.append(hedge)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            failed: Optional["asyncio.Future[httpx.Response]"] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in tasks:
+                    if task not in done:
+                        continue
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    status = task.result().status_code
+                    if status == 429 or status >= 500:
+                        failed = failed or task
+                        continue
+                    winner = task
+                    if task is not tasks[0]:
+                        self.breaker.hedge_wins += 1
+                    return task.result()
+            if failed is not None:
+                # Both requests failed; an error response beats an exception
+                winner = failed
+                return failed.result()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if task is not winner:
+                    task.cancel()
+                    task.add_done_callback(self._discard_response)
+    
+    @staticmethod
+    def _discard_response(task: "asyncio.Future[httpx.Response]") -> None:
+        """Close the response of a request that lost a hedged race."""
+        if task.cancelled() or task.exception() is not None:
+            return
+        asyncio.ensure_future(task.result().aclose())
     
     async def _make_request(
         self, 
@@ -22,39 +436,260 @@ class TrainingPeaksClient:
         json_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Make an authenticated request to the API."""
-        token = await self.auth.get_valid_token()
-        headers = {"Authorization": f"Bearer {token}"}
+        response = await self._send(method, endpoint, params=params, json_data=json_data)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _cached_get(
+        self,
+        endpoint: str,
+        ttl: float,
+        params: Optional[Dict[str, Any]] = None,
+        parser: Optional[ParserFactory] = None
+    ) -> Any:
+        """GET through the response cache with stale-while-revalidate.
         
-        url = f"{self.base_url}{endpoint}"
+        With ``parser``, the body is streamed into a new parser and its
+        result is returned and cached instead of the decoded JSON; concurrent
+        misses for the same request share that result.
+        """
+        if self.cache is None:
+            if parser is None:
+                return await self._make_request("GET", endpoint, params=params)
+            return await self._coalesce_parsed(
+                endpoint,
+                params,
+                parser,
+                lambda: self._fetch_parsed(endpoint, params, parser)
+            )
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                json=json_data,
-                timeout=30.0
+        key = self._cache_key(endpoint, params)
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.is_fresh():
+                self.cache.hits += 1
+                return entry.value
+            if entry.is_servable_stale():
+                self.cache.stale_hits += 1
+                self._revalidate_in_background(key, endpoint, params, ttl, entry, parser)
+                return entry.value
+        
+        self.cache.misses += 1
+        try:
+            return await self._coalesce_parsed(
+                endpoint,
+                params,
+                parser,
+                lambda: self._revalidate(key, endpoint, params, ttl, entry, parser)
             )
-            response.raise_for_status()
-            return response.json()
+        except (CircuitOpenError, httpx.TransportError, httpx.HTTPStatusError) as e:
+            if entry is None or self.breaker is None or not self._is_outage(e):
+                raise
+            return self._serve_stale(endpoint, entry, e)
+    
+    async def _fetch_parsed(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        parser: ParserFactory
+    ) -> Any:
+        """GET an endpoint, streaming its body into a new parser."""
+        sink = parser()
+        response = await self._send("GET", endpoint, params=params, sink=sink)
+        response.raise_for_status()
+        return sink.result()
+    
+    @staticmethod
+    def _is_outage(error: Exception) -> bool:
+        """Check whether an error is an API outage rather than a bad request."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return status == 429 or status >= 500
+        return True
+    
+    def _serve_stale(self, endpoint: str, entry: CacheEntry, error: Exception) -> Any:
+        """Answer from an expired cache entry while the API is unavailable."""
+        assert self.breaker is not None
+        self.breaker.stale_served += 1
+        age = int(time.monotonic() - entry.expires_at)
+        logger.warning("Serving stale %s (expired %ds ago): %s", endpoint, age, error)
+        note_stale_read(
+            f"{endpoint_class(endpoint)} data is cached and expired {age}s ago; "
+            "the TrainingPeaks API is currently unavailable"
+        )
+        return entry.value
+    
+    async def _revalidate(
+        self,
+        key: Hashable,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        ttl: float,
+        entry: Optional[CacheEntry],
+        parser: Optional[ParserFactory] = None
+    ) -> Any:
+        """Fetch a cacheable endpoint, conditionally if validators are known."""
+        assert self.cache is not None
+        generation = self.cache.generation
+        headers = {}
+        if entry is not None:
+            self.cache.revalidations += 1
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        
+        sink = parser() if parser is not None else None
+        response = await self._send("GET", endpoint, params=params, headers=headers, sink=sink)
+        if response.status_code == 304 and entry is not None:
+            self.cache.not_modified += 1
+            if generation == self.cache.generation:
+                self.cache.touch(key, ttl, self.config.cache_stale_ttl)
+            return entry.value
+        
+        response.raise_for_status()
+        if sink is None:
+            value, size = response.json(), len(response.content)
+        else:
+            value, size = sink.result(), sink.size
+        self.cache.set(
+            key,
+            value,
+            ttl,
+            stale_ttl=self.config.cache_stale_ttl,
+            size=size,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            generation=generation,
+        )
+        return value
+    
+    def _revalidate_in_background(
+        self,
+        key: Hashable,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        ttl: float,
+        entry: CacheEntry,
+        parser: Optional[ParserFactory] = None
+    ) -> None:
+        """Start at most one background revalidation per cache key."""
+        task = self._revalidations.get(key)
+        if task is not None and not task.done():
+            return
+        task = asyncio.ensure_future(
+            self._revalidate(key, endpoint, params, ttl, entry, parser)
+        )
+        self._revalidations[key] = task
+        task.add_done_callback(lambda t: self._revalidation_done(key, t))
+    
+    def _revalidation_done(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._revalidations.get(key) is task:
+            del self._revalidations[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background revalidation of %s failed: %s", key, task.exception())
+    
+    @staticmethod
+    def _normalize_params(
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Tuple[str, str], ...]:
+        """Turn query params into a sorted, hashable tuple."""
+        items = (params or {}).items()
+        return tuple(sorted((k, str(v)) for k, v in items if v is not None))
+    
+    @classmethod
+    def _cache_key(
+        cls,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        """Build a hashable cache key from an endpoint and its query params."""
+        return endpoint, cls._normalize_params(params)
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached responses, e.g. after the tokens changed.
+        
+        The workout store survives; before its next sync it is checked
+        against the athlete the tokens belong to, and cleared only if it
+        holds another athlete's data.
+        """
+        if self.cache is not None:
+            self.cache.clear()
+        self._recent_syncs.clear()
+        self._store_claimed = False
+        for task in self._revalidations.values():
+            task.cancel()
+        self._revalidations.clear()
+    
+    async def aclose(self) -> None:
+        """Cancel background revalidations and close the workout store."""
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        self._revalidations.clear()
+        if self.store is not None:
+            self.store.close()
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Get how many GETs went upstream and how many shared an in-flight one."""
+        return {
+            "enabled": self.config.coalesce_requests,
+            "upstream": self.upstream_requests,
+            "coalesced": self.coalesced_requests,
+            "in_flight": len(self._inflight),
+        }
+    
+    def breaker_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker states and hedging counters."""
+        if self.breaker is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.breaker.stats()}
+    
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Get rate limiter counters."""
+        if self.rate_limiter is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.rate_limiter.stats()}
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get response cache counters."""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
     
     async def get_athlete_profile(self) -> Dict[str, Any]:
         """Get the authenticated athlete's profile information."""
-        return await self._make_request("GET", "/v1/athlete")
+        return await self._cached_get("/v1/athlete", ttl=self.config.cache_profile_ttl)
     
     async def get_athlete_zones(self) -> Dict[str, Any]:
         """Get the authenticated athlete's training zones."""
-        return await self._make_request("GET", "/v1/athlete/zones")
+        return await self._cached_get(
+            "/v1/athlete/zones",
+            ttl=self.config.cache_zones_ttl
+        )
     
     async def get_workouts(
         self, 
         start_date: Optional[str] = None, 
         end_date: Optional[str] = None,
-        limit: int = 50
+        limit: Optional[int] = 50
     ) -> List[Dict[str, Any]]:
-        """Get athlete's workouts within a date range."""
-        params = {"limit": limit}
+        """Get athlete's workouts within a date range.
+        
+        With a local workout store and both dates given, only the parts of the
+        range not synced before are fetched; the rest is read from the store.
+        With both dates and ``limit=None``, every workout in the range is
+        returned via ``iter_workouts``.
+        """
+        if limit is None and start_date and end_date:
+            return [w async for w in self.iter_workouts(start_date, end_date)]
+        if self.store is not None and start_date and end_date:
+            start, end = parse_date(start_date), parse_date(end_date)
+            await self._sync_workouts(start, end)
+            return self.store.query(start, end, limit=limit)
+        
+        params: Dict[str, Any] = {}
+        if limit is not None:
+            params["limit"] = limit
         if start_date:
             params["startDate"] = start_date
         if end_date:
@@ -63,9 +698,211 @@ class TrainingPeaksClient:
         response = await self._make_request("GET", "/v1/athlete/workouts", params=params)
         return response.get("workouts", [])
     
+    async def iter_workouts(
+        self,
+        start_date: str,
+        end_date: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every workout in a date range, ordered by date.
+        
+        The range is fetched in windows of ``workout_window_days`` with at most
+        ``workout_fetch_concurrency`` requests in flight, and workouts are
+        de-duplicated by ID. With a local workout store, only missing windows
+        are fetched and the stream is read from the store.
+        """
+        start, end = parse_date(start_date), parse_date(end_date)
+        if self.store is not None:
+            await self._sync_workouts(start, end)
+            for workout in self.store.query(start, end):
+                yield workout
+            return
+        
+        seen = set()
+        windows = split_range(start, end, self.config.workout_window_days)
+        async for _, workouts, _ in self._iter_windows(windows):
+            for workout in sorted(workouts, key=_workout_sort_key):
+                wid = workout_id(workout)
+                if wid is not None:
+                    if wid in seen:
+                        continue
+                    seen.add(wid)
+                yield workout
+    
+    async def _sync_workouts(self, start: date, end: date) -> None:
+        """Fetch the sub-ranges of ``start``..``end`` missing from the store."""
+        assert self.store is not None
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        
+        # Recent days can still gain workouts, so they are never marked synced
+        synced_until = date.today() - timedelta(days=self.config.workout_store_recent_days)
+        async with self._sync_lock:
+            await self._claim_store()
+            self._expire_recent_syncs()
+            windows = [
+                window
+                for gap in self.store.missing_ranges(start, end)
+                if not self._recently_synced(gap)
+                for window in split_range(*gap, self.config.workout_window_days)
+            ]
+            async for window, workouts, truncated in self._iter_windows(windows):
+                window_start, window_end = window
+                # A truncated day is stored but fetched again, as are later days
+                mark_until = min(
+                    [synced_until] + [day - timedelta(days=1) for day in truncated]
+                )
+                self.store.replace_range(
+                    window_start,
+                    window_end,
+                    workouts,
+                    mark_synced_until=mark_until
+                )
+                if window_end > mark_until:
+                    self._recent_syncs[(window_start, window_end)] = time.monotonic()
+    
+    async def _claim_store(self) -> None:
+        """Make sure the workout store holds the current athlete's data."""
+        assert self.store is not None
+        if self._store_claimed:
+            return
+        profile = await self.get_athlete_profile()
+        owner = next(
+            (str(profile[key]) for key in ATHLETE_ID_KEYS if profile.get(key) is not None),
+            None
+        )
+        if owner is None:
+            logger.warning("Athlete profile has no ID; cannot verify the workout store")
+        elif self.store.claim(owner):
+            logger.info("Cleared the workout store of another athlete's data")
+            self._recent_syncs.clear()
+        self._store_claimed = True
+    
+    def _expire_recent_syncs(self) -> None:
+        """Forget recent windows older than ``workout_store_recent_ttl``."""
+        cutoff = time.monotonic() - self.config.workout_store_recent_ttl
+        for window, fetched_at in list(self._recent_syncs.items()):
+            if fetched_at <= cutoff:
+                del self._recent_syncs[window]
+    
+    def _recently_synced(self, gap: DateRange) -> bool:
+        """Check whether an unsynced gap lies inside a window fetched lately."""
+        return any(
+            start <= gap[0] and gap[1] <= end for start, end in self._recent_syncs
+        )
+    
+    async def _iter_windows(
+        self,
+        windows: List[DateRange]
+    ) -> AsyncIterator[Tuple[DateRange, List[Dict[str, Any]], List[date]]]:
+        """Fetch day ranges concurrently, yielding results in window order.
+        
+        Each window comes with its workouts and the days found truncated.
+        """
+        concurrency = max(1, self.config.workout_fetch_concurrency)
+        pending: Deque[Tuple[DateRange, "asyncio.Future[RangeFetch]"]] = deque()
+        try:
+            for window in windows:
+                pending.append(
+                    (window, asyncio.ensure_future(self._fetch_workout_range(*window)))
+                )
+                if len(pending) >= concurrency:
+                    done_window, task = pending.popleft()
+                    yield (done_window, *await task)
+            while pending:
+                done_window, task = pending.popleft()
+                yield (done_window, *await task)
+        finally:
+            for _, task in pending:
+                task.cancel()
+    
+    async def _fetch_workout_range(self, start: date, end: date) -> RangeFetch:
+        """Fetch every workout in a day range, splitting it if a page is full.
+        
+        Requests share ``workout_fetch_concurrency`` slots with those of other
+        windows. Returns the workouts and any single day whose page was still
+        full, so may be missing workouts.
+        """
+        if self._fetch_semaphore is None:
+            self._fetch_semaphore = asyncio.Semaphore(
+                max(1, self.config.workout_fetch_concurrency)
+            )
+        limit = self.config.workout_sync_limit
+        params = {
+            "startDate": format_date(start),
+            "endDate": format_date(end),
+            "limit": limit,
+        }
+        async with self._fetch_semaphore:
+            response = await self._make_request(
+                "GET", "/v1/athlete/workouts", params=params
+            )
+        workouts = response.get("workouts", [])
+        if len(workouts) < limit:
+            return workouts, []
+        if start == end:
+            logger.warning(
+                "Workouts on %s fill a page of %d; some may be missing",
+                format_date(start),
+                limit
+            )
+            return workouts, [start]
+        
+        # A full page may be truncated; fetch each half of the range instead
+        middle = start + (end - start) // 2
+        (first, first_truncated), (second, second_truncated) = await asyncio.gather(
+            self._fetch_workout_range(start, middle),
+            self._fetch_workout_range(middle + timedelta(days=1), end)
+        )
+        return first + second, first_truncated + second_truncated
+    
     async def get_workout_details(self, workout_id: str) -> Dict[str, Any]:
-        """Get detailed information about a specific workout."""
-        return await self._make_request("GET", f"/v1/athlete/workouts/{workout_id}")
+        """Get detailed information about a specific workout.
+        
+        The body is stream-parsed; per-sample data under ``samples`` is
+        returned as ``WorkoutSamples`` (float32 arrays), not JSON lists.
+        """
+        from .analytics.samples import SampleStreamParser
+        
+        return await self._cached_get(
+            f"/v1/athlete/workouts/{workout_id}",
+            ttl=self.config.cache_workout_details_ttl,
+            parser=SampleStreamParser
+        )
+    
+    async def get_workout_details_batch(
+        self,
+        workout_ids: List[str],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get details for several workouts concurrently.
+        
+        Duplicate IDs are fetched once. A failed workout does not fail the
+        batch; its error message is reported under ``errors`` instead.
+        """
+        unique_ids = list(dict.fromkeys(str(wid) for wid in workout_ids))
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.config.batch_concurrency))
+        
+        async def fetch(wid: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_workout_details(wid)
+        
+        results = await asyncio.gather(
+            *(fetch(wid) for wid in unique_ids),
+            return_exceptions=True
+        )
+        
+        workouts: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for wid, result in zip(unique_ids, results):
+            if isinstance(result, BaseException):
+                # A cancelled fetch means the batch was cancelled; don't
+                # report it as a workout error
+                if not isinstance(result, Exception):
+                    raise result
+                errors[wid] = str(result) or type(result).__name__
+            else:
+                workouts[wid] = result
+        return {"workouts": workouts, "errors": errors}
     
     async def get_calendar_events(
         self, 
@@ -101,5 +938,9 @@ class TrainingPeaksClient:
     async def get_planned_workouts(self, days_ahead: int = 7) -> List[Dict[str, Any]]:
         """Get planned workouts up to 7 days in the future."""
         params = {"daysAhead": min(days_ahead, 7)}
-        response = await self._make_request("GET", "/v1/athlete/planned-workouts", params=params)
+        response = await self._cached_get(
+            "/v1/athlete/planned-workouts",
+            ttl=self.config.cache_planned_ttl,
+            params=params
+        )
         return response.get("workouts", [])
\ No newline at end of file
@@ -1,12 +1,10 @@
 """Configuration management for TrainingPeaks MCP server."""
 
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
-
-load_dotenv()
 
 
 class TrainingPeaksConfig(BaseSettings):
@@ -23,15 +21,161 @@ class TrainingPeaksConfig(BaseSettings):
         env="TRAININGPEAKS_SCOPES"
     )
     environment: str = Field(default="sandbox", env="TRAININGPEAKS_ENVIRONMENT")
+    base_url: Optional[str] = Field(default=None, env="TRAININGPEAKS_BASE_URL")
+    
+    # HTTP connection pool
+    http2: bool = Field(default=False, env="TRAININGPEAKS_HTTP2")
+    max_connections: int = Field(default=100, env="TRAININGPEAKS_MAX_CONNECTIONS")
+    max_keepalive_connections: int = Field(
+        default=20,
+        env="TRAININGPEAKS_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    keepalive_expiry: float = Field(default=30.0, env="TRAININGPEAKS_KEEPALIVE_EXPIRY")
+    connect_timeout: float = Field(default=10.0, env="TRAININGPEAKS_CONNECT_TIMEOUT")
+    read_timeout: float = Field(default=30.0, env="TRAININGPEAKS_READ_TIMEOUT")
+    write_timeout: float = Field(default=30.0, env="TRAININGPEAKS_WRITE_TIMEOUT")
+    pool_timeout: float = Field(default=10.0, env="TRAININGPEAKS_POOL_TIMEOUT")
+    
+    # OAuth tokens
+    token_store_path: Optional[str] = Field(
+        default="~/.trainingpeaks-mcp/tokens.json",
+        env="TRAININGPEAKS_TOKEN_STORE_PATH"
+    )
+    token_refresh_buffer: int = Field(
+        default=300,
+        env="TRAININGPEAKS_TOKEN_REFRESH_BUFFER"
+    )
+    token_refresh_lead: int = Field(default=300, env="TRAININGPEAKS_TOKEN_REFRESH_LEAD")
+    
+    # Response cache
+    cache_enabled: bool = Field(default=True, env="TRAININGPEAKS_CACHE_ENABLED")
+    cache_max_entries: int = Field(default=256, env="TRAININGPEAKS_CACHE_MAX_ENTRIES")
+    cache_max_bytes: int = Field(
+        default=8 * 1024 * 1024,
+        env="TRAININGPEAKS_CACHE_MAX_BYTES"
+    )
+    cache_stale_ttl: float = Field(default=300.0, env="TRAININGPEAKS_CACHE_STALE_TTL")
+    cache_profile_ttl: float = Field(default=3600.0, env="TRAININGPEAKS_CACHE_PROFILE_TTL")
+    cache_zones_ttl: float = Field(default=3600.0, env="TRAININGPEAKS_CACHE_ZONES_TTL")
+    cache_workout_details_ttl: float = Field(
+        default=900.0,
+        env="TRAININGPEAKS_CACHE_WORKOUT_DETAILS_TTL"
+    )
+    cache_planned_ttl: float = Field(default=600.0, env="TRAININGPEAKS_CACHE_PLANNED_TTL")
+    
+    # Local workout store
+    workout_store_path: Optional[str] = Field(
+        default="~/.trainingpeaks-mcp/workouts.db",
+        env="TRAININGPEAKS_WORKOUT_STORE_PATH"
+    )
+    workout_store_recent_days: int = Field(
+        default=2,
+        env="TRAININGPEAKS_WORKOUT_STORE_RECENT_DAYS"
+    )
+    workout_store_recent_ttl: float = Field(
+        default=300.0,
+        env="TRAININGPEAKS_WORKOUT_STORE_RECENT_TTL"
+    )
+    workout_sync_limit: int = Field(default=500, env="TRAININGPEAKS_WORKOUT_SYNC_LIMIT")
+    workout_window_days: int = Field(default=30, env="TRAININGPEAKS_WORKOUT_WINDOW_DAYS")
+    workout_fetch_concurrency: int = Field(
+        default=4,
+        env="TRAININGPEAKS_WORKOUT_FETCH_CONCURRENCY"
+    )
+    batch_concurrency: int = Field(default=8, env="TRAININGPEAKS_BATCH_CONCURRENCY")
+    coalesce_requests: bool = Field(default=True, env="TRAININGPEAKS_COALESCE_REQUESTS")
+    
+    # Coach mode
+    athletes_dir: Optional[str] = Field(
+        default="~/.trainingpeaks-mcp/athletes",
+        env="TRAININGPEAKS_ATHLETES_DIR"
+    )
+    coach_concurrency: int = Field(default=64, env="TRAININGPEAKS_COACH_CONCURRENCY")
+    
+    # Background prefetch
+    prefetch_enabled: bool = Field(default=False, env="TRAININGPEAKS_PREFETCH_ENABLED")
+    prefetch_interval: float = Field(default=300.0, env="TRAININGPEAKS_PREFETCH_INTERVAL")
+    prefetch_jitter: float = Field(default=30.0, env="TRAININGPEAKS_PREFETCH_JITTER")
+    prefetch_days: int = Field(default=14, env="TRAININGPEAKS_PREFETCH_DAYS")
+    
+    # Analytics
+    pmc_warmup_days: int = Field(default=180, env="TRAININGPEAKS_PMC_WARMUP_DAYS")
+    
+    # Tool responses
+    compact_json: bool = Field(default=True, env="TRAININGPEAKS_COMPACT_JSON")
+    response_max_bytes: int = Field(
+        default=200_000,
+        env="TRAININGPEAKS_RESPONSE_MAX_BYTES"
+    )
+    
+    # Observability
+    metrics_file: Optional[str] = Field(default=None, env="TRAININGPEAKS_METRICS_FILE")
+    metrics_file_interval: float = Field(
+        default=60.0,
+        env="TRAININGPEAKS_METRICS_FILE_INTERVAL"
+    )
+    otel_enabled: bool = Field(default=False, env="TRAININGPEAKS_OTEL_ENABLED")
+    
+    # MCP transport
+    transport: str = Field(default="stdio", env="TRAININGPEAKS_TRANSPORT")
+    http_host: str = Field(default="127.0.0.1", env="TRAININGPEAKS_HTTP_HOST")
+    http_port: int = Field(default=8000, env="TRAININGPEAKS_HTTP_PORT")
+    http_workers: int = Field(default=1, env="TRAININGPEAKS_HTTP_WORKERS")
+    http_stateless: bool = Field(default=False, env="TRAININGPEAKS_HTTP_STATELESS")
+    http_json_response: bool = Field(
+        default=False,
+        env="TRAININGPEAKS_HTTP_JSON_RESPONSE"
+    )
+    http_auth_token: Optional[str] = Field(default=None, env="TRAININGPEAKS_HTTP_AUTH_TOKEN")
+    
+    # Client-side rate limiting and retries
+    rate_limit_enabled: bool = Field(default=True, env="TRAININGPEAKS_RATE_LIMIT_ENABLED")
+    # Requests per second by endpoint class; unlisted classes are only paused
+    # when the API reports its quota is spent
+    rate_limit_rates: Dict[str, float] = Field(
+        default={},
+        env="TRAININGPEAKS_RATE_LIMIT_RATES"
+    )
+    rate_limit_burst: int = Field(default=10, env="TRAININGPEAKS_RATE_LIMIT_BURST")
+    initial_concurrency: int = Field(default=8, env="TRAININGPEAKS_INITIAL_CONCURRENCY")
+    max_concurrency: int = Field(default=32, env="TRAININGPEAKS_MAX_CONCURRENCY")
+    max_retries: int = Field(default=3, env="TRAININGPEAKS_MAX_RETRIES")
+    retry_backoff_base: float = Field(default=0.5, env="TRAININGPEAKS_RETRY_BACKOFF_BASE")
+    retry_backoff_max: float = Field(default=30.0, env="TRAININGPEAKS_RETRY_BACKOFF_MAX")
+    
+    # Circuit breaker and hedged requests
+    breaker_enabled: bool = Field(default=True, env="TRAININGPEAKS_BREAKER_ENABLED")
+    breaker_failure_ratio: float = Field(
+        default=0.5,
+        env="TRAININGPEAKS_BREAKER_FAILURE_RATIO"
+    )
+    breaker_min_requests: int = Field(default=10, env="TRAININGPEAKS_BREAKER_MIN_REQUESTS")
+    breaker_window: int = Field(default=20, env="TRAININGPEAKS_BREAKER_WINDOW")
+    breaker_slow_call: float = Field(default=10.0, env="TRAININGPEAKS_BREAKER_SLOW_CALL")
+    breaker_open_seconds: float = Field(
+        default=30.0,
+        env="TRAININGPEAKS_BREAKER_OPEN_SECONDS"
+    )
+    hedge_enabled: bool = Field(default=True, env="TRAININGPEAKS_HEDGE_ENABLED")
+    hedge_percentile: float = Field(default=95.0, env="TRAININGPEAKS_HEDGE_PERCENTILE")
+    hedge_min_samples: int = Field(default=20, env="TRAININGPEAKS_HEDGE_MIN_SAMPLES")
+    hedge_min_delay: float = Field(default=0.05, env="TRAININGPEAKS_HEDGE_MIN_DELAY")
+    hedge_median_factor: float = Field(
+        default=3.0,
+        env="TRAININGPEAKS_HEDGE_MEDIAN_FACTOR"
+    )
     
     class Config:
         env_file = ".env"
+        env_prefix = "TRAININGPEAKS_"
         validate_assignment = True
         extra = "ignore"
     
     @property
     def api_base_url(self) -> str:
         """Get the appropriate API base URL based on environment."""
+        if self.base_url:
+            return self.base_url.rstrip("/")
         if self.environment == "production":
             return "https://api.trainingpeaks.com"
         return "https://sandbox-api.trainingpeaks.com"
@@ -51,6 +195,13 @@ class TrainingPeaksConfig(BaseSettings):
         return bool(self.client_id and self.client_secret)
 
 
+@lru_cache(maxsize=None)
 def get_config() -> TrainingPeaksConfig:
-    """Get the configuration instance."""
-    return TrainingPeaksConfig()
\ No newline at end of file
+    """Get the configuration instance, parsed once per process.
+
+    Call ``get_config.cache_clear()`` to re-read the environment.
+    """
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    return TrainingPeaksConfig()
@@ -0,0 +1,82 @@
+"""Date helpers shared by the workout store and analytics."""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+DateRange = Tuple[date, date]
+
+# Keys under which the API reports a workout's date and identifier
+WORKOUT_DATE_KEYS = (
+    "workoutDay", "WorkoutDay", "startTime", "StartTime", "date", "startDate"
+)
+WORKOUT_ID_KEYS = ("id", "workoutId", "WorkoutId", "Id")
+
+
+def parse_date(value: str) -> date:
+    """Parse a YYYY-MM-DD date, ignoring any time component."""
+    return date.fromisoformat(value[:10])
+
+
+def format_date(value: date) -> str:
+    """Format a date as YYYY-MM-DD."""
+    return value.isoformat()
+
+
+def workout_date(workout: Dict[str, Any]) -> Optional[str]:
+    """Get a workout's day as YYYY-MM-DD, if it has one."""
+    for key in WORKOUT_DATE_KEYS:
+        value = workout.get(key)
+        if value:
+            return str(value)[:10]
+    return None
+
+
+def workout_id(workout: Dict[str, Any]) -> Optional[str]:
+    """Get a workout's identifier as a string, if it has one."""
+    for key in WORKOUT_ID_KEYS:
+        value = workout.get(key)
+        if value is not None:
+            return str(value)
+    return None
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """Merge overlapping or adjacent inclusive day ranges."""
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(start: date, end: date, covered: List[DateRange]) -> List[DateRange]:
+    """Get the sub-ranges of ``start``..``end`` not covered by ``covered``."""
+    gaps: List[DateRange] = []
+    cursor = start
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - timedelta(days=1)))
+        cursor = max(cursor, covered_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def split_range(start: date, end: date, window_days: int) -> List[DateRange]:
+    """Split an inclusive day range into consecutive windows of ``window_days``."""
+    windows: List[DateRange] = []
+    step = timedelta(days=max(1, window_days))
+    cursor = start
+    while cursor <= end:
+        window_end = min(end, cursor + step - timedelta(days=1))
+        windows.append((cursor, window_end))
+        cursor = window_end + timedelta(days=1)
+    return windows
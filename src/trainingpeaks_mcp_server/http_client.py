@@ -0,0 +1,65 @@
+"""Shared, pooled HTTP connection layer for the TrainingPeaks API."""
+
+import importlib.util
+import logging
+from typing import Optional
+import httpx
+from .config import TrainingPeaksConfig, get_config
+
+logger = logging.getLogger(__name__)
+
+
+class SharedHTTPClient:
+    """Own a single long-lived ``httpx.AsyncClient`` for all API traffic.
+
+    The underlying client is created lazily on first use so that it binds to
+    the running event loop, and is re-created if it was closed.
+    """
+
+    def __init__(self, config: Optional[TrainingPeaksConfig] = None):
+        self.config = config or get_config()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the pooled client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Build an ``httpx.AsyncClient`` from the pool settings in the config."""
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            connect=self.config.connect_timeout,
+            read=self.config.read_timeout,
+            write=self.config.write_timeout,
+            pool=self.config.pool_timeout,
+        )
+        return httpx.AsyncClient(
+            http2=self._http2_enabled(),
+            limits=limits,
+            timeout=timeout,
+        )
+
+    def _http2_enabled(self) -> bool:
+        """Check whether HTTP/2 was requested and the ``h2`` package is available."""
+        if not self.config.http2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "HTTP/2 requested but the 'h2' package is not installed; "
+                "falling back to HTTP/1.1. Install with 'pip install httpx[http2]'."
+            )
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
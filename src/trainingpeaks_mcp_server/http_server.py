@@ -0,0 +1,208 @@
+"""Streamable HTTP transport serving many MCP sessions from one process.
+
+Every session shares one ``TrainingPeaksMCPServer``, so the connection pool,
+response caches, workout store and token state are paid for once per process
+instead of once per conversation.
+"""
+
+import contextlib
+import hmac
+import logging
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    MutableMapping,
+    Optional,
+)
+
+from mcp.server.lowlevel import NotificationOptions
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import BaseRoute, Mount, Route
+
+from .config import TrainingPeaksConfig, get_config
+from .server import TrainingPeaksMCPServer
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Paths answered without the bearer token, for load balancer health checks
+PUBLIC_PATHS = ("/healthz",)
+
+
+class _SessionManagerApp:
+    """ASGI app forwarding requests to the streamable HTTP session manager."""
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+class _BearerAuth:
+    """ASGI middleware rejecting requests without the configured bearer token."""
+
+    def __init__(self, app: ASGIApp, token: str):
+        self.app = app
+        self.expected = f"Bearer {token}".encode("utf-8")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] not in PUBLIC_PATHS:
+            supplied = Headers(scope=scope).get("authorization", "").encode("utf-8")
+            if not hmac.compare_digest(supplied, self.expected):
+                response = PlainTextResponse(
+                    "Unauthorized",
+                    status_code=401,
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def create_app(
+    mcp_server: Optional[TrainingPeaksMCPServer] = None,
+    config: Optional[TrainingPeaksConfig] = None
+) -> Starlette:
+    """Build the ASGI app.
+
+    Routes: ``/mcp`` (streamable HTTP), ``/sse`` and ``/messages/`` (legacy
+    SSE, single worker only), ``/healthz`` and ``/metrics`` (Prometheus text).
+    With ``http_auth_token`` set, every route but ``/healthz`` requires it as
+    a bearer token.
+    """
+    config = config or get_config()
+    _check_exposure(config)
+    mcp_server = mcp_server or TrainingPeaksMCPServer()
+    # Sessions live in one worker's memory; with several workers any request
+    # may reach any worker, so each request must stand on its own
+    stateless = config.http_stateless or config.http_workers > 1
+    security = _security_settings(config.http_host)
+    session_manager = StreamableHTTPSessionManager(
+        app=mcp_server.server,
+        json_response=config.http_json_response,
+        stateless=stateless,
+        security_settings=security,
+    )
+
+    async def healthz(request: Request) -> Response:
+        return PlainTextResponse("ok")
+
+    async def metrics(request: Request) -> Response:
+        return PlainTextResponse(
+            mcp_server.server_stats("prometheus"),
+            media_type="text/plain; version=0.0.4",
+        )
+
+    routes: List[BaseRoute] = [
+        Route("/mcp", endpoint=_SessionManagerApp(session_manager)),
+        Route("/healthz", endpoint=healthz, methods=["GET"]),
+        Route("/metrics", endpoint=metrics, methods=["GET"]),
+    ]
+    if not stateless:
+        routes.extend(_sse_routes(mcp_server, security))
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with session_manager.run():
+            if config.prefetch_enabled:
+                mcp_server.warm_up()
+            try:
+                yield
+            finally:
+                await mcp_server.aclose()
+
+    middleware = []
+    if config.http_auth_token:
+        middleware.append(Middleware(_BearerAuth, token=config.http_auth_token))
+    return Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+
+
+def _sse_routes(
+    mcp_server: TrainingPeaksMCPServer,
+    security: Optional[TransportSecuritySettings]
+) -> List[BaseRoute]:
+    """Get routes for clients that only speak the older HTTP+SSE transport."""
+    sse = SseServerTransport("/messages/", security_settings=security)
+
+    async def handle_sse(request: Request) -> Response:
+        async with sse.connect_sse(
+            request.scope, request.receive, request._send
+        ) as (read_stream, write_stream):
+            await mcp_server.server.run(
+                read_stream,
+                write_stream,
+                mcp_server.server.create_initialization_options(
+                    notification_options=NotificationOptions(),
+                    experimental_capabilities={}
+                )
+            )
+        return Response()
+
+    return [
+        Route("/sse", endpoint=handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse.handle_post_message),
+    ]
+
+
+def _security_settings(host: str) -> Optional[TransportSecuritySettings]:
+    """Guard a loopback-bound server against DNS rebinding from web pages."""
+    if host not in LOCAL_HOSTS:
+        return None
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=["127.0.0.1:*", "localhost:*", "[::1]:*"],
+        allowed_origins=["http://127.0.0.1:*", "http://localhost:*", "http://[::1]:*"],
+    )
+
+
+def _check_exposure(config: TrainingPeaksConfig) -> None:
+    """Refuse to serve athlete data beyond loopback without authentication."""
+    if config.http_host not in LOCAL_HOSTS and not config.http_auth_token:
+        raise ValueError(
+            f"Refusing to bind {config.http_host} without authentication; "
+            "set TRAININGPEAKS_HTTP_AUTH_TOKEN or bind a loopback address"
+        )
+
+
+def serve(config: Optional[TrainingPeaksConfig] = None) -> None:
+    """Run the HTTP transport with uvicorn until interrupted."""
+    import uvicorn
+
+    config = config or get_config()
+    _check_exposure(config)
+    logger.info(
+        "Serving MCP over HTTP on %s:%d with %d worker(s)",
+        config.http_host, config.http_port, config.http_workers
+    )
+    if config.http_workers > 1:
+        # Workers are separate processes that each build their own app
+        uvicorn.run(
+            f"{__name__}:create_app",
+            factory=True,
+            host=config.http_host,
+            port=config.http_port,
+            workers=config.http_workers,
+        )
+    else:
+        uvicorn.run(
+            create_app(config=config),
+            host=config.http_host,
+            port=config.http_port,
+        )
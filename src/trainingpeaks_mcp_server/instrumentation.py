@@ -0,0 +1,267 @@
+"""Latency histograms, counters and span hooks for tool calls and API requests."""
+
+import logging
+import os
+import tempfile
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, as used by Prometheus client libraries
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+PREFIX = "trainingpeaks"
+
+SpanHook = Callable[[str, Dict[str, Any]], ContextManager[Any]]
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with constant-time observations."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Get count, mean, p50/p95/p99 and max in milliseconds."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2),
+            "p50_ms": round(self.quantile(0.5) * 1000, 2),
+            "p95_ms": round(self.quantile(0.95) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class Metrics:
+    """Registry of per-tool and per-endpoint measurements.
+
+    Recording is a few dictionary updates, so it stays on the hot path;
+    span hooks are only entered when some are registered.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: DefaultDict[Tuple[str, Labels], float] = defaultdict(float)
+        self.span_hooks: List[SpanHook] = []
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Get or create the histogram for a metric name and label set."""
+        key = (name, tuple(labels.items()))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add ``value`` to a counter."""
+        self.counters[(name, tuple(labels.items()))] += value
+
+    def record_tool_call(
+        self,
+        tool: str,
+        duration: float,
+        outcome: str,
+        serialization: float = 0.0,
+        response_bytes: int = 0
+    ) -> None:
+        """Record one MCP tool call."""
+        self.histogram("tool_call_duration_seconds", tool=tool).observe(duration)
+        self.increment("tool_calls_total", tool=tool, outcome=outcome)
+        if response_bytes:
+            self.histogram("tool_serialization_seconds", tool=tool).observe(serialization)
+            self.increment("tool_response_bytes_total", response_bytes, tool=tool)
+
+    def record_request(
+        self,
+        endpoint: str,
+        duration: float,
+        status: str,
+        bytes_sent: int = 0,
+        bytes_received: int = 0
+    ) -> None:
+        """Record one upstream API request attempt."""
+        self.histogram("upstream_request_duration_seconds", endpoint=endpoint).observe(
+            duration
+        )
+        self.increment("upstream_responses_total", endpoint=endpoint, status=status)
+        if bytes_sent:
+            self.increment("upstream_bytes_sent_total", bytes_sent, endpoint=endpoint)
+        if bytes_received:
+            self.increment(
+                "upstream_bytes_received_total", bytes_received, endpoint=endpoint
+            )
+
+    def add_span_hook(self, hook: SpanHook) -> None:
+        """Register a hook that returns a context manager wrapping each span."""
+        self.span_hooks.append(hook)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Run the enclosed block inside the spans of every registered hook."""
+        if not self.span_hooks:
+            yield
+            return
+        with ExitStack() as stack:
+            for hook in self.span_hooks:
+                try:
+                    stack.enter_context(hook(name, attributes))
+                except Exception as e:
+                    logger.debug("Span hook failed for %s: %s", name, e)
+            yield
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all measurements grouped by metric and label values."""
+        result: Dict[str, Any] = {"uptime_s": round(time.time() - self.started, 1)}
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            result.setdefault(name, {})[_label_key(labels)] = histogram.summary()
+        for (name, labels), value in sorted(self.counters.items()):
+            number = int(value) if float(value).is_integer() else round(value, 3)
+            result.setdefault(name, {})[_label_key(labels)] = number
+        return result
+
+    def prometheus(self, gauges: Optional[Mapping[str, float]] = None) -> str:
+        """Render all measurements in the Prometheus text exposition format."""
+        lines: List[str] = []
+        typed = set()
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            metric = f"{PREFIX}_{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                le = labels + (("le", repr(bound)),)
+                lines.append(f"{metric}_bucket{_format_labels(le)} {cumulative}")
+            le = labels + (("le", "+Inf"),)
+            lines.append(f"{metric}_bucket{_format_labels(le)} {histogram.count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"{PREFIX}_{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+        for name, value in sorted((gauges or {}).items()):
+            metric = f"{PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(
+        self,
+        path: str,
+        gauges: Optional[Mapping[str, float]] = None
+    ) -> None:
+        """Atomically write the Prometheus text dump, e.g. for node_exporter."""
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{target.name}.", dir=str(target.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus(gauges))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def opentelemetry_span_hook(tracer_name: str = "trainingpeaks-mcp-server") -> SpanHook:
+    """Build a span hook that records spans with the OpenTelemetry API.
+
+    Raises ``ImportError`` if ``opentelemetry-api`` is not installed.
+    """
+    from opentelemetry import trace
+
+    tracer = trace.get_tracer(tracer_name)
+
+    def hook(name: str, attributes: Dict[str, Any]) -> ContextManager[Any]:
+        return tracer.start_as_current_span(
+            name,
+            attributes={k: v for k, v in attributes.items() if v is not None},
+        )
+
+    return hook
+
+
+def flatten_stats(prefix: str, stats: Mapping[str, Any]) -> Dict[str, float]:
+    """Turn numeric entries of a stats dict into ``prefix_key`` gauges."""
+    return {
+        f"{prefix}_{key}": float(value)
+        for key, value in stats.items()
+        if isinstance(value, (int, float))
+    }
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _label_key(labels: Labels) -> str:
+    return ",".join(value for _, value in labels) or "all"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
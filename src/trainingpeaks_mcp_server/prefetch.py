@@ -0,0 +1,149 @@
+"""Background prefetching of the data most sessions start with."""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .client import TrainingPeaksClient
+from .dates import format_date
+
+logger = logging.getLogger(__name__)
+
+# Delay before retrying a cycle deferred because the API is busy or throttling
+CONGESTED_RETRY_DELAY = 15.0
+
+Job = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+class PrefetchScheduler:
+    """Keep profile, zones, planned and recent workouts warm in the client's caches.
+
+    Every ``interval`` seconds (plus or minus ``jitter``) the scheduler fetches
+    each item through the client, one at a time, so requests go through the
+    same response cache, workout store and rate limiter as tool calls.
+    Fresh entries cost nothing; stale ones are revalidated. A cycle is
+    skipped while the athlete has no tokens and deferred while the rate
+    limiter is congested, so prefetching never competes with tool calls.
+    """
+
+    def __init__(
+        self,
+        client: TrainingPeaksClient,
+        interval: float = 300.0,
+        jitter: float = 30.0,
+        days: int = 14
+    ):
+        self.client = client
+        self.interval = interval
+        self.jitter = jitter
+        self.days = days
+        self.cycles = 0
+        self.deferred = 0
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """Start the prefetch loop if an event loop is running."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    def wake(self) -> None:
+        """Run the next cycle now, e.g. after new tokens were set."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        # Spread the first cycle so that athletes and workers do not fire together
+        delay = random.uniform(0, self.jitter)
+        while True:
+            await self._sleep(delay)
+            if not self.client.auth.has_tokens():
+                delay = self._next_delay()
+                continue
+            completed = await self.prefetch_once()
+            delay = self._next_delay() if completed else CONGESTED_RETRY_DELAY
+
+    async def _sleep(self, delay: float) -> None:
+        """Sleep for ``delay`` seconds or until woken."""
+        assert self._wake is not None
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def _next_delay(self) -> float:
+        return max(1.0, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    def jobs(self) -> List[Job]:
+        """Get the (name, fetch) pairs warmed by each cycle, in order."""
+        jobs: List[Job] = [
+            ("profile", self.client.get_athlete_profile),
+            ("zones", self.client.get_athlete_zones),
+            ("planned_workouts", self.client.get_planned_workouts),
+        ]
+        if self.client.store is not None:
+            # Without the store, workout lists are not kept between calls
+            jobs.append(("recent_workouts", self._recent_workouts))
+        return jobs
+
+    async def _recent_workouts(self) -> Any:
+        """Fetch the last ``days`` days through the end of this week."""
+        today = date.today()
+        return await self.client.get_workouts(
+            format_date(today - timedelta(days=self.days)),
+            format_date(today + timedelta(days=6 - today.weekday())),
+            limit=None
+        )
+
+    async def prefetch_once(self) -> bool:
+        """Run one cycle; return False if it was deferred by a congested API."""
+        limiter = self.client.rate_limiter
+        for name, fetch in self.jobs():
+            if limiter is not None and limiter.congested():
+                self.deferred += 1
+                logger.debug(
+                    "Prefetch deferred before %s: API busy or throttling", name
+                )
+                return False
+            try:
+                await fetch()
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Prefetch of %s failed: %s", name, e)
+        self.cycles += 1
+        self.last_run = time.time()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cycle counters and how long ago the last cycle finished."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "cycles": self.cycles,
+            "deferred": self.deferred,
+            "failures": self.failures,
+            "last_run_age_s": (
+                round(time.time() - self.last_run, 1) if self.last_run else None
+            ),
+        }
+
+    async def aclose(self) -> None:
+        """Stop the prefetch loop."""
+        task = self._task
+        self._task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,304 @@
+"""Client-side rate limiting for TrainingPeaks API requests."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Optional
+
+# Endpoint prefixes mapped to the budget they draw from, most specific first
+ENDPOINT_CLASSES = (
+    ("/oauth", "oauth"),
+    ("/v1/athlete/workouts", "workouts"),
+    ("/v1/athlete/planned-workouts", "workouts"),
+    ("/v1/athlete/calendar", "calendar"),
+    ("/v1/athlete/metrics", "metrics"),
+    ("/v1/athlete", "athlete"),
+)
+
+
+def endpoint_class(endpoint: str) -> str:
+    """Get the rate-limit class an endpoint belongs to."""
+    for prefix, name in ENDPOINT_CLASSES:
+        if endpoint.startswith(prefix):
+            return name
+    return "default"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def parse_rate_limit_reset(headers: Mapping[str, str]) -> Optional[float]:
+    """Get seconds until the quota resets when ``X-RateLimit-Remaining`` is 0."""
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return None
+    try:
+        if float(remaining) > 0:
+            return None
+        reset_value = float(reset)
+    except ValueError:
+        return None
+    # Some APIs send an epoch timestamp, others a delay in seconds
+    if reset_value > 1e9:
+        return max(0.0, reset_value - time.time())
+    return max(0.0, reset_value)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Get a full-jitter exponential backoff delay for a retry attempt."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Token bucket that can also be paused until a server-given time.
+
+    A bucket without a rate hands out tokens freely and only honours pauses.
+    """
+
+    def __init__(self, rate: Optional[float], capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            self.tokens = self.capacity
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping as needed; return the time spent waiting."""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                delay = self.paused_until - now
+            else:
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                assert self.rate is not None
+                delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def try_acquire(self) -> bool:
+        """Take one token if one is available right now."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` and start refilling from empty."""
+        until = time.monotonic() + seconds
+        if until > self.paused_until:
+            self.paused_until = until
+            self.tokens = 0.0
+            self.updated = until
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 32,
+        backoff_ratio: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.backoff_ratio = backoff_ratio
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit."""
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # We were woken but will not use the slot; pass it on
+                    self._wake()
+                raise
+        self.in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free right now and nobody is waiting for it."""
+        if self.in_flight >= int(self.limit) or self._waiters:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Free a slot taken by ``acquire``."""
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        """Grow the limit by roughly one slot per round trip of successes."""
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_throttle(self) -> None:
+        """Shrink the limit after a 429, at most once per cooldown period."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.backoff_ratio)
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class RateLimiter:
+    """Per-endpoint-class token buckets behind an adaptive concurrency limit.
+
+    Endpoint classes without a configured rate (nor a ``default`` one) are
+    not throttled up front; they only pause when the server signals its
+    quota is spent, through a 429 or ``X-RateLimit-*`` headers.
+    """
+
+    def __init__(
+        self,
+        rates: Mapping[str, Optional[float]],
+        burst: int,
+        initial_concurrency: int,
+        max_concurrency: int,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.rates = dict(rates)
+        self.burst = burst
+        self.concurrency = AIMDLimiter(initial_concurrency, maximum=max_concurrency)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.throttled = 0
+        self.retries = 0
+        self.wait_time = 0.0
+
+    def bucket(self, name: str) -> TokenBucket:
+        """Get the token bucket for an endpoint class."""
+        bucket = self.buckets.get(name)
+        if bucket is None:
+            rate = self.rates.get(name, self.rates.get("default"))
+            bucket = self.buckets[name] = TokenBucket(rate, self.burst)
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str) -> AsyncIterator[None]:
+        """Hold a rate-limit token and a concurrency slot for one request."""
+        self.wait_time += await self.bucket(endpoint_class(endpoint)).acquire()
+        await self.concurrency.acquire()
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def try_acquire(self, name: str) -> bool:
+        """Take a token and a slot for an endpoint class without waiting.
+
+        Returns False, taking nothing, unless both are available right now;
+        a True result must be followed by ``release``.
+        """
+        if not self.concurrency.try_acquire():
+            return False
+        if not self.bucket(name).try_acquire():
+            self.concurrency.release()
+            return False
+        return True
+
+    def release(self) -> None:
+        """Free a slot taken by ``try_acquire``."""
+        self.concurrency.release()
+
+    def observe(
+        self,
+        endpoint: str,
+        status_code: int,
+        headers: Mapping[str, str]
+    ) -> Optional[float]:
+        """Update limits from a response; return the server-requested delay, if any.
+
+        Buckets pause for at most ``backoff_max``; callers decide whether a
+        longer server-requested delay is worth waiting for.
+        """
+        bucket = self.bucket(endpoint_class(endpoint))
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        reset = parse_rate_limit_reset(headers)
+        if status_code == 429:
+            self.throttled += 1
+            self.concurrency.on_throttle()
+            delay = retry_after if retry_after is not None else reset
+            pause = delay if delay is not None else self.backoff_delay(0)
+            bucket.pause(min(pause, self.backoff_max))
+            return delay
+        if reset is not None:
+            bucket.pause(min(reset, self.backoff_max))
+        if status_code < 500:
+            self.concurrency.on_success()
+        return retry_after
+
+    def congested(self) -> bool:
+        """Check whether every slot is taken or the server asked us to pause."""
+        now = time.monotonic()
+        return (
+            self.concurrency.in_flight >= int(self.concurrency.limit)
+            or any(bucket.paused_until > now for bucket in self.buckets.values())
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Get a full-jitter exponential backoff delay for a retry attempt."""
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get throttling counters and the current adaptive limit."""
+        return {
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "wait_time": round(self.wait_time, 3),
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+        }
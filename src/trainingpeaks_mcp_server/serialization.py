@@ -0,0 +1,241 @@
+"""Field projection, size budgets and compact JSON encoding for tool results."""
+
+import json
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# Bytes reserved for the truncation marker added to a cut-down result
+MARKER_RESERVE = 256
+
+# Truncation passes before a result still over budget is returned as is
+FIT_PASSES = 3
+
+TRUNCATION_HINT = "Narrow the date range, request fewer fields or raise max_bytes"
+
+FieldSpec = Dict[str, "FieldSpec"]
+
+
+def dumps(value: Any, compact: bool = True) -> bytes:
+    """Encode a value as UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, option=option)
+    if compact:
+        text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    else:
+        text = json.dumps(value, indent=2, ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+def encode(value: Any, compact: bool = True) -> str:
+    """Encode a value as a JSON string."""
+    return dumps(value, compact).decode("utf-8")
+
+
+def parse_fields(fields: Sequence[str]) -> FieldSpec:
+    """Turn dotted field paths such as ``workouts.*.title`` into a nested spec.
+
+    An empty spec keeps the whole value at that path; ``*`` matches every key
+    of a mapping.
+    """
+    spec: FieldSpec = {}
+    for path in fields:
+        node = spec
+        parts = [part for part in path.split(".") if part]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = {}
+            elif part in node and not node[part]:
+                # A shorter path already keeps the whole subtree
+                break
+            else:
+                node = node.setdefault(part, {})
+    return spec
+
+
+def project(value: Any, spec: FieldSpec) -> Any:
+    """Keep only the fields named in ``spec``, applied to every list element."""
+    if not spec:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "*" in spec:
+        return {key: project(item, spec["*"]) for key, item in value.items()}
+    return {key: project(value[key], sub) for key, sub in spec.items() if key in value}
+
+
+def fit_budget(value: Any, max_bytes: int, compact: bool = True) -> Any:
+    """Truncate the largest lists in a result until it encodes to ``max_bytes``.
+
+    A top-level list is wrapped in ``{"items": ..., "more_available": true}``;
+    lists (or aligned columns) inside a mapping are cut in place and reported
+    under ``_truncated``. Whatever cannot be cut is returned as is. Sizes are
+    those of the compact or indented encoding, per ``compact``.
+    """
+    return _fit(value, max_bytes, compact)[0]
+
+
+def _fit(value: Any, max_bytes: int, compact: bool) -> Tuple[Any, bytes]:
+    """Fit a value to ``max_bytes`` and return it with its final encoding."""
+    encoded = dumps(value, compact)
+    size = len(encoded)
+    result, correction = value, 0
+    for _ in range(FIT_PASSES):
+        if len(encoded) <= max_bytes:
+            break
+        fitted = _truncate(value, max_bytes - correction, size, compact)
+        if fitted is value:
+            break
+        result, encoded = fitted, dumps(fitted, compact)
+        # Row sizes are estimates; cut by the overshoot on the next pass, and
+        # by twice as much after that, so whole-row rounding cannot stall
+        correction = max(2 * correction, correction + len(encoded) - max_bytes)
+    return result, encoded
+
+
+def _truncate(value: Any, max_bytes: int, size: int, compact: bool) -> Any:
+    """Cut the largest collections of a value that encodes to ``size`` bytes."""
+    if isinstance(value, list):
+        sizes = _item_sizes([value], compact, depth=1)
+        kept = _cut(sizes, max_bytes - (size - sum(sizes)))
+        return {
+            "items": value[:kept],
+            "returned": kept,
+            "total": len(value),
+            "more_available": True,
+            "hint": TRUNCATION_HINT,
+        }
+    if not isinstance(value, dict):
+        return value
+
+    result = dict(value)
+    truncated: Dict[str, Dict[str, int]] = {}
+    for path, columns, keyed, depth in _candidates(result, compact):
+        sizes = _item_sizes(columns, compact, depth, keyed)
+        total = len(sizes)
+        listed = sum(sizes)
+        available = max_bytes - (size - listed)
+        kept = _cut(sizes, available)
+        if kept < total:
+            _replace(result, path, [column[:kept] for column in columns], keyed)
+            truncated[".".join(path)] = {"returned": kept, "total": total}
+            size = size - listed + sum(sizes[:kept])
+        if size + MARKER_RESERVE <= max_bytes:
+            break
+    if not truncated:
+        return value
+    result["_truncated"] = truncated
+    result["more_available"] = True
+    result["hint"] = TRUNCATION_HINT
+    return result
+
+
+def _candidates(
+    value: Dict[str, Any],
+    compact: bool = True
+) -> List[Tuple[Tuple[str, ...], List[List[Any]], bool, int]]:
+    """Find truncatable collections one or two levels deep, largest first.
+
+    Rows are list items, the columns of a columnar series (a mapping of
+    equal-length lists, cut together so they stay aligned) or the entries of
+    a mapping of records keyed by ID. Each comes with the nesting depth of
+    its rows.
+    """
+    found: List[Tuple[int, Tuple[str, ...], List[List[Any]], bool, int]] = []
+    for key, item in value.items():
+        if isinstance(item, list) and item:
+            found.append((len(dumps(item, compact)), (key,), [item], False, 2))
+        elif isinstance(item, dict) and item:
+            values = list(item.values())
+            if all(isinstance(v, dict) for v in values):
+                found.append(
+                    (len(dumps(item, compact)), (key,), [list(item.items())], True, 2)
+                )
+            elif all(isinstance(v, list) for v in values):
+                if len({len(v) for v in values}) == 1 and values[0]:
+                    found.append((len(dumps(item, compact)), (key,), values, False, 3))
+                elif len({len(v) for v in values}) > 1:
+                    for sub_key, sub in item.items():
+                        if sub:
+                            found.append(
+                                (len(dumps(sub, compact)), (key, sub_key), [sub], False, 3)
+                            )
+    found.sort(key=lambda candidate: candidate[0], reverse=True)
+    return [candidate[1:] for candidate in found]
+
+
+def _replace(
+    value: Dict[str, Any],
+    path: Tuple[str, ...],
+    columns: List[List[Any]],
+    keyed: bool
+) -> None:
+    """Store cut-down rows back at ``path``, copying mappings along the way."""
+    if keyed:
+        value[path[0]] = dict(columns[0])
+    elif len(path) == 2:
+        parent = value[path[0]] = dict(value[path[0]])
+        parent[path[1]] = columns[0]
+    elif isinstance(value[path[0]], dict):
+        value[path[0]] = dict(zip(value[path[0]].keys(), columns))
+    else:
+        value[path[0]] = columns[0]
+
+
+def _item_sizes(
+    columns: List[List[Any]],
+    compact: bool = True,
+    depth: int = 0,
+    keyed: bool = False
+) -> List[int]:
+    """Get the encoded size of each row, including its separator.
+
+    Keyed rows are ``(key, value)`` mapping entries. Indented rows also pay
+    a newline and two spaces per nesting level on every line.
+    """
+    sizes = [0] * len(columns[0])
+    for column in columns:
+        for i, item in enumerate(column):
+            if keyed:
+                key, item = item
+                sizes[i] += len(dumps(key)) + (1 if compact else 2)
+            encoded = dumps(item, compact)
+            sizes[i] += len(encoded) + 1
+            if not compact:
+                sizes[i] += 1 + 2 * depth * (encoded.count(b"\n") + 1)
+    return sizes
+
+
+def _cut(sizes: List[int], available: int) -> int:
+    """Get how many leading rows fit in ``available`` bytes."""
+    budget = available - MARKER_RESERVE
+    if budget <= 0:
+        return 0
+    return bisect_right(list(accumulate(sizes)), budget)
+
+
+def render(
+    value: Any,
+    fields: Optional[Sequence[str]] = None,
+    max_bytes: Optional[int] = None,
+    compact: bool = True
+) -> str:
+    """Project, fit to a byte budget and encode a tool result.
+
+    A result within budget is encoded only once, by the size check.
+    """
+    if fields:
+        value = project(value, parse_fields(fields))
+    if max_bytes:
+        return _fit(value, max_bytes, compact)[1].decode("utf-8")
+    return encode(value, compact)
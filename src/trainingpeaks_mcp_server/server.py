@@ -1,252 +1,1075 @@
 """TrainingPeaks MCP Server implementation."""
 
+import argparse
 import asyncio
-import json
-from typing import Any, Dict, List, Optional
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import (
     CallToolResult,
-    InitializeResult,
     Tool,
     TextContent,
-    Implementation,
 )
 from mcp.server.lowlevel import NotificationOptions
-from .auth import TrainingPeaksAuth
-from .client import TrainingPeaksClient
+from . import __version__
+from .breaker import collect_stale_reads
+from .dates import format_date, parse_date, workout_date, workout_id
+from .instrumentation import Metrics, flatten_stats
+from .serialization import render
+
+if TYPE_CHECKING:
+    from .analytics.pmc import PMCEngine
+    from .athletes import AthleteContext, AthleteRegistry
+    from .auth import TrainingPeaksAuth
+    from .client import TrainingPeaksClient
+    from .http_client import SharedHTTPClient
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownToolError(Exception):
+    """Raised when a tool name is not one of ours."""
+
+# Response options shared by every data tool
+RESPONSE_OPTIONS: Dict[str, Any] = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only return these fields, as dotted paths applied to every list item (e.g. ['id', 'title', 'workoutDay'] or ['workouts.*.title'])"
+    },
+    "max_bytes": {
+        "type": "integer",
+        "description": "Truncate long lists so the response fits in this many bytes, marking it with 'more_available' (default: 200000, 0 for no limit)",
+        "minimum": 0
+    }
+}
+
+# Athlete selector accepted by every athlete-specific tool
+ATHLETE_OPTION: Dict[str, Any] = {
+    "athlete": {
+        "type": "string",
+        "description": "Coach mode: athlete ID to query, or 'all' to query every athlete concurrently (default: the single configured athlete)"
+    }
+}
+
+# Views of per-sample data (power, heart rate, ...) in workout details
+SAMPLE_OPTIONS: Dict[str, Any] = {
+    "sample_points": {
+        "type": "integer",
+        "description": "Also return samples averaged into at most this many equal time buckets (default: 0, summary statistics only)",
+        "minimum": 0,
+        "maximum": 5000
+    },
+    "sample_channels": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only summarize these sample channels, e.g. ['power', 'heartRate'] (default: all)"
+    }
+}
+
+# Tools that report on the server itself rather than an athlete
+SERVER_TOOLS = ("get_server_stats", "list_athletes")
 
 
 class TrainingPeaksMCPServer:
     """MCP Server for TrainingPeaks API integration."""
     
-    def __init__(self):
-        self.server = Server("trainingpeaks-mcp-server")
-        self.auth = TrainingPeaksAuth()
-        self.client = TrainingPeaksClient(self.auth)
+    def __init__(self) -> None:
+        self.server = Server("trainingpeaks-mcp-server", version=__version__)
+        # API clients and analytics are built on first tool use so that
+        # startup only pays for the MCP handshake and the tool list
+        self._http: Optional["SharedHTTPClient"] = None
+        self._athletes: Optional["AthleteRegistry"] = None
+        self.metrics = Metrics()
+        self._tool_names = frozenset(tool.name for tool in self.tools())
+        self._metrics_task: Optional["asyncio.Task[None]"] = None
         self._setup_tools()
     
-    def _setup_tools(self):
-        """Setup MCP tools for TrainingPeaks API."""
+    @property
+    def http(self) -> "SharedHTTPClient":
+        """Get the shared HTTP client, building the API clients if needed."""
+        if self._http is None:
+            self._build_clients()
+            assert self._http is not None
+        return self._http
+    
+    @property
+    def athletes(self) -> "AthleteRegistry":
+        """Get the per-athlete contexts, building the API clients if needed."""
+        if self._athletes is None:
+            self._build_clients()
+            assert self._athletes is not None
+        return self._athletes
+    
+    @property
+    def auth(self) -> "TrainingPeaksAuth":
+        """Get the default athlete's OAuth handler."""
+        return self.athletes.default.auth
+    
+    @property
+    def client(self) -> "TrainingPeaksClient":
+        """Get the default athlete's API client."""
+        return self.athletes.default.client
+    
+    @property
+    def pmc(self) -> "PMCEngine":
+        """Get the default athlete's Performance Management Chart engine."""
+        return self.athletes.default.pmc
+    
+    def _build_clients(self) -> None:
+        """Import and construct the HTTP client and the default athlete's clients."""
+        from .athletes import AthleteRegistry
+        from .http_client import SharedHTTPClient
         
-        @self.server.list_tools()
-        async def list_tools() -> List[Tool]:
-            """List available TrainingPeaks tools."""
-            return [
-                Tool(
-                    name="get_athlete_profile",
-                    description="Get the authenticated athlete's profile information including basic details and training zones",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="get_workouts",
-                    description="Get athlete's workouts within a specified date range",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "start_date": {
-                                "type": "string",
-                                "description": "Start date in YYYY-MM-DD format (optional)"
-                            },
-                            "end_date": {
-                                "type": "string", 
-                                "description": "End date in YYYY-MM-DD format (optional)"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum number of workouts to return (default: 50)",
-                                "default": 50
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="get_workout_details",
-                    description="Get detailed information about a specific workout",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "workout_id": {
-                                "type": "string",
-                                "description": "The unique identifier of the workout"
-                            }
-                        },
-                        "required": ["workout_id"]
-                    }
-                ),
-                Tool(
-                    name="get_calendar_events",
-                    description="Get calendar events from athlete's TrainingPeaks calendar",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "start_date": {
-                                "type": "string",
-                                "description": "Start date in YYYY-MM-DD format (optional)"
-                            },
-                            "end_date": {
-                                "type": "string",
-                                "description": "End date in YYYY-MM-DD format (optional)"
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="get_metrics",
-                    description="Get metrics data such as weight, HRV, steps, stress, and sleep quality",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "metric_type": {
-                                "type": "string",
-                                "description": "Type of metric (weight, hrv, steps, stress, sleep)",
-                                "enum": ["weight", "hrv", "steps", "stress", "sleep"]
-                            },
-                            "start_date": {
-                                "type": "string",
-                                "description": "Start date in YYYY-MM-DD format (optional)"
-                            },
-                            "end_date": {
-                                "type": "string",
-                                "description": "End date in YYYY-MM-DD format (optional)"
-                            }
-                        },
-                        "required": ["metric_type"]
-                    }
-                ),
-                Tool(
-                    name="get_planned_workouts",
-                    description="Get planned workouts for the athlete up to 7 days in the future",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "days_ahead": {
-                                "type": "integer",
-                                "description": "Number of days ahead to retrieve (max: 7, default: 7)",
-                                "default": 7,
-                                "maximum": 7
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="set_auth_tokens",
-                    description="Set authentication tokens for TrainingPeaks API access",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "access_token": {
-                                "type": "string",
-                                "description": "OAuth access token"
-                            },
-                            "refresh_token": {
-                                "type": "string",
-                                "description": "OAuth refresh token"
-                            },
-                            "expires_in": {
-                                "type": "integer",
-                                "description": "Token expiration time in seconds"
-                            }
-                        },
-                        "required": ["access_token", "refresh_token", "expires_in"]
-                    }
+        self._http = SharedHTTPClient()
+        self._athletes = AthleteRegistry(self._http, self.metrics)
+        # Load the default athlete's tokens and start its refresh loop now
+        self._athletes.get()
+        self._setup_observability()
+    
+    def warm_up(self) -> None:
+        """Build the API clients now instead of on first use.
+        
+        Used when prefetching is enabled, so the scheduler starts before the
+        first tool call rather than after it.
+        """
+        if self._athletes is None:
+            self._build_clients()
+    
+    def _setup_observability(self) -> None:
+        """Register OpenTelemetry spans and the metrics file export, if configured."""
+        config = self.client.config
+        if config.otel_enabled:
+            from .instrumentation import opentelemetry_span_hook
+            
+            try:
+                self.metrics.add_span_hook(opentelemetry_span_hook())
+            except ImportError:
+                logger.warning(
+                    "OpenTelemetry requested but 'opentelemetry-api' is not installed"
                 )
-            ]
+        if config.metrics_file and self._metrics_task is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._metrics_task = asyncio.ensure_future(self._export_metrics())
+    
+    async def _export_metrics(self) -> None:
+        """Periodically rewrite the Prometheus metrics file."""
+        while True:
+            await asyncio.sleep(self.client.config.metrics_file_interval)
+            self._write_metrics_file()
+    
+    def _write_metrics_file(self) -> None:
+        path = self.client.config.metrics_file
+        if not path:
+            return
+        try:
+            self.metrics.write_prometheus(path, self._gauges())
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", path, e)
+    
+    def _gauges(self) -> Dict[str, float]:
+        """Get the default athlete's client counters as flat gauges."""
+        if self._athletes is None:
+            return {}
+        client = self._athletes.default.client
+        return {
+            **flatten_stats("cache", client.cache_stats()),
+            **flatten_stats("rate_limit", client.rate_limit_stats()),
+            **flatten_stats("coalescing", client.coalescing_stats()),
+            **flatten_stats("breaker", client.breaker_stats()),
+            **flatten_stats("prefetch", self._prefetch_stats()),
+            "athletes_active": float(len(self._athletes.contexts())),
+        }
+    
+    def _prefetch_stats(self) -> Dict[str, Any]:
+        """Get the default athlete's prefetch counters."""
+        prefetch = self.athletes.default.prefetch
+        if prefetch is None:
+            return {"enabled": False}
+        return {"enabled": True, **prefetch.stats()}
+    
+    def server_stats(self, output_format: str = "json") -> Any:
+        """Get tool and API request measurements plus client counters."""
+        if output_format == "prometheus":
+            return self.metrics.prometheus(self._gauges())
+        stats: Dict[str, Any] = self.metrics.snapshot()
+        if self._athletes is not None:
+            client = self._athletes.default.client
+            stats["cache"] = client.cache_stats()
+            stats["rate_limit"] = client.rate_limit_stats()
+            stats["coalescing"] = client.coalescing_stats()
+            stats["breaker"] = client.breaker_stats()
+            stats["prefetch"] = self._prefetch_stats()
+            stats["athletes_active"] = len(self._athletes.contexts())
+        return stats
+    
+    async def aclose(self) -> None:
+        """Stop background work and release pooled connections."""
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+            self._metrics_task = None
+            self._write_metrics_file()
+        if self._athletes is not None:
+            await self._athletes.aclose()
+        if self._http is not None:
+            await self._http.aclose()
+    
+    async def _performance_management(
+        self,
+        arguments: Dict[str, Any],
+        athlete: "AthleteContext"
+    ) -> Dict[str, Any]:
+        """Compute fitness (CTL), fatigue (ATL) and form (TSB) for a date range."""
+        end = (
+            parse_date(arguments["end_date"])
+            if arguments.get("end_date") else date.today()
+        )
+        start = (
+            parse_date(arguments["start_date"])
+            if arguments.get("start_date") else end - timedelta(days=89)
+        )
+        if start > end:
+            raise ValueError("start_date must not be after end_date")
+        ctl_days = arguments.get("ctl_days", 42)
+        atl_days = arguments.get("atl_days", 7)
         
-        @self.server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
-            """Execute TrainingPeaks tool calls."""
+        pmc = athlete.pmc
+        
+        # Load the range plus a warm-up period, and fill any gap to what the
+        # engine already holds so its daily series stays contiguous
+        fetch_start = start - timedelta(days=athlete.client.config.pmc_warmup_days)
+        fetch_end = end
+        if pmc.start is not None and pmc.end is not None:
+            if pmc.end < fetch_start:
+                fetch_start = pmc.end + timedelta(days=1)
+            if pmc.start > fetch_end:
+                fetch_end = pmc.start - timedelta(days=1)
+        workouts = await athlete.client.get_workouts(
+            start_date=format_date(fetch_start),
+            end_date=format_date(fetch_end),
+            limit=None
+        )
+        from .analytics.pmc import daily_tss, summarize, to_columns
+        
+        pmc.update(fetch_start, daily_tss(workouts, fetch_start, fetch_end))
+        
+        series = pmc.series(start, end, ctl_days=ctl_days, atl_days=atl_days)
+        result: Dict[str, Any] = {
+            "ctl_days": ctl_days,
+            "atl_days": atl_days,
+            "summary": summarize(series, start),
+        }
+        if arguments.get("mode", "summary") == "series":
+            result["series"] = to_columns(
+                series,
+                start,
+                resolution=arguments.get("resolution", "weekly")
+            )
+        return result
+    
+    def tools(self) -> List[Tool]:
+        """Get the definitions of the available TrainingPeaks tools."""
+        tools = [
+            Tool(
+                name="get_athlete_profile",
+                description="Get the authenticated athlete's profile information including basic details and training zones",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_workouts",
+                description="Get athlete's workouts within a specified date range",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "start_date": {
+                            "type": "string",
+                            "description": "Start date in YYYY-MM-DD format (optional)"
+                        },
+                        "end_date": {
+                            "type": "string", 
+                            "description": "End date in YYYY-MM-DD format (optional)"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of workouts to return (default: 50)",
+                            "default": 50
+                        },
+                        "fetch_all": {
+                            "type": "boolean",
+                            "description": "Return every workout in the date range, fetched in parallel windows (ignores limit; requires start_date and end_date)",
+                            "default": False
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_workout_details",
+                description="Get detailed information about a specific workout",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "workout_id": {
+                            "type": "string",
+                            "description": "The unique identifier of the workout"
+                        },
+                        **SAMPLE_OPTIONS
+                    },
+                    "required": ["workout_id"]
+                }
+            ),
+            Tool(
+                name="get_workout_details_batch",
+                description="Get detailed information about several workouts at once, fetched concurrently. Failed workouts are reported per ID under 'errors'",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "workout_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Unique identifiers of the workouts (duplicates are fetched once)"
+                        },
+                        "concurrency": {
+                            "type": "integer",
+                            "description": "Maximum number of workouts fetched at the same time (default: 8)",
+                            "minimum": 1,
+                            "maximum": 32
+                        },
+                        **SAMPLE_OPTIONS
+                    },
+                    "required": ["workout_ids"]
+                }
+            ),
+            Tool(
+                name="get_calendar_events",
+                description="Get calendar events from athlete's TrainingPeaks calendar",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "start_date": {
+                            "type": "string",
+                            "description": "Start date in YYYY-MM-DD format (optional)"
+                        },
+                        "end_date": {
+                            "type": "string",
+                            "description": "End date in YYYY-MM-DD format (optional)"
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_metrics",
+                description="Get metrics data such as weight, HRV, steps, stress, and sleep quality. Use aggregate, baseline_days or max_points to get a compact summary instead of every raw value",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "metric_type": {
+                            "type": "string",
+                            "description": "Type of metric (weight, hrv, steps, stress, sleep)",
+                            "enum": ["weight", "hrv", "steps", "stress", "sleep"]
+                        },
+                        "start_date": {
+                            "type": "string",
+                            "description": "Start date in YYYY-MM-DD format (optional)"
+                        },
+                        "end_date": {
+                            "type": "string",
+                            "description": "End date in YYYY-MM-DD format (optional)"
+                        },
+                        "aggregate": {
+                            "type": "string",
+                            "description": "Aggregate values into buckets with count, mean, min and max (optional)",
+                            "enum": ["daily", "weekly", "monthly"]
+                        },
+                        "percentiles": {
+                            "type": "array",
+                            "items": {"type": "number", "minimum": 0, "maximum": 100},
+                            "description": "Percentiles to compute per bucket when aggregating, e.g. [10, 50, 90]"
+                        },
+                        "baseline_days": {
+                            "type": "integer",
+                            "description": "Add a trailing rolling baseline (mean and standard deviation) over this many days",
+                            "minimum": 1
+                        },
+                        "max_points": {
+                            "type": "integer",
+                            "description": "Downsample the series to at most this many shape-preserving points (LTTB); defaults to 500 when aggregate or baseline_days is given",
+                            "minimum": 3
+                        }
+                    },
+                    "required": ["metric_type"]
+                }
+            ),
+            Tool(
+                name="get_planned_workouts",
+                description="Get planned workouts for the athlete up to 7 days in the future",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "days_ahead": {
+                            "type": "integer",
+                            "description": "Number of days ahead to retrieve (max: 7, default: 7)",
+                            "default": 7,
+                            "maximum": 7
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_performance_management",
+                description="Get fitness (CTL), fatigue (ATL) and form (TSB) from the Performance Management Chart, computed server-side from workout TSS. Returns a compact summary, or a daily/weekly series",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "start_date": {
+                            "type": "string",
+                            "description": "Start date in YYYY-MM-DD format (default: 90 days before end_date)"
+                        },
+                        "end_date": {
+                            "type": "string",
+                            "description": "End date in YYYY-MM-DD format (default: today)"
+                        },
+                        "mode": {
+                            "type": "string",
+                            "description": "'summary' for key values only, 'series' to also return the time series (default: summary)",
+                            "enum": ["summary", "series"],
+                            "default": "summary"
+                        },
+                        "resolution": {
+                            "type": "string",
+                            "description": "Series resolution when mode is 'series' (default: weekly)",
+                            "enum": ["daily", "weekly"],
+                            "default": "weekly"
+                        },
+                        "ctl_days": {
+                            "type": "number",
+                            "description": "CTL (fitness) time constant in days (default: 42)",
+                            "default": 42,
+                            "minimum": 1
+                        },
+                        "atl_days": {
+                            "type": "number",
+                            "description": "ATL (fatigue) time constant in days (default: 7)",
+                            "default": 7,
+                            "minimum": 1
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_power_curve",
+                description="Get the best average power (or speed, heart rate, cadence) over standard durations across workouts in a date range, with the workout holding each record. Curves are computed server-side from workout samples and cached per workout",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "start_date": {
+                            "type": "string",
+                            "description": "Start date in YYYY-MM-DD format (default: January 1 of end_date's year)"
+                        },
+                        "end_date": {
+                            "type": "string",
+                            "description": "End date in YYYY-MM-DD format (default: today)"
+                        },
+                        "channel": {
+                            "type": "string",
+                            "description": "Sample channel to analyze; 'speed' also reports pace in seconds per km (default: power)",
+                            "enum": ["power", "speed", "heartRate", "cadence"],
+                            "default": "power"
+                        },
+                        "durations": {
+                            "type": "array",
+                            "items": {"type": "integer", "minimum": 1, "maximum": 86400},
+                            "description": "Window lengths in seconds (default: 1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)"
+                        },
+                        "sport": {
+                            "type": "string",
+                            "description": "Only include workouts of this type, e.g. 'Bike' or 'Run' (default: all)"
+                        },
+                        "top": {
+                            "type": "integer",
+                            "description": "Best efforts to list per duration (default: 1)",
+                            "default": 1,
+                            "minimum": 1,
+                            "maximum": 10
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_time_in_zones",
+                description="Get time spent in each heart rate, power and pace zone (hours and percent), totalled by week, sport or workout, for a list of workouts or a date range. Computed server-side from workout samples and the athlete's zones",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "workout_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Workouts to analyze; takes precedence over the date range",
+                            "maxItems": 500
+                        },
+                        "start_date": {
+                            "type": "string",
+                            "description": "Start date in YYYY-MM-DD format (default: 28 days before end_date)"
+                        },
+                        "end_date": {
+                            "type": "string",
+                            "description": "End date in YYYY-MM-DD format (default: today)"
+                        },
+                        "group_by": {
+                            "type": "string",
+                            "description": "How to total workouts besides the overall total (default: week)",
+                            "enum": ["week", "sport", "workout", "total"],
+                            "default": "week"
+                        },
+                        "channels": {
+                            "type": "array",
+                            "items": {"type": "string", "enum": ["heartRate", "power", "speed"]},
+                            "description": "Zone types to report; 'speed' uses pace zones (default: every type the athlete has zones for)"
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_weekly_summary",
+                description="Get planned versus completed training for one week (workouts, TSS, hours, missed workouts, compliance and per-sport totals). Use athlete='all' for a compact summary of every athlete",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "week_of": {
+                            "type": "string",
+                            "description": "Any date in the week (Monday to Sunday) in YYYY-MM-DD format (default: this week)"
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="list_athletes",
+                description="List the athletes known in coach mode and whether each has valid tokens",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            ),
+            Tool(
+                name="get_server_stats",
+                description="Get server performance statistics: tool call and API request latency percentiles, status codes, retries, cache hit ratio, circuit breaker states, bytes transferred and serialization time",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "format": {
+                            "type": "string",
+                            "description": "'json' for a structured summary, 'prometheus' for the Prometheus text format (default: json)",
+                            "enum": ["json", "prometheus"],
+                            "default": "json"
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="set_auth_tokens",
+                description="Set authentication tokens for TrainingPeaks API access",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "access_token": {
+                            "type": "string",
+                            "description": "OAuth access token"
+                        },
+                        "refresh_token": {
+                            "type": "string",
+                            "description": "OAuth refresh token"
+                        },
+                        "expires_in": {
+                            "type": "integer",
+                            "description": "Token expiration time in seconds"
+                        },
+                        "athlete": {
+                            "type": "string",
+                            "description": "Coach mode: athlete ID the tokens belong to (default: the single configured athlete)"
+                        }
+                    },
+                    "required": ["access_token", "refresh_token", "expires_in"]
+                }
+            )
+        ]
+        for tool in tools:
+            if tool.name not in ("get_server_stats", "set_auth_tokens"):
+                tool.inputSchema["properties"].update(RESPONSE_OPTIONS)
+            if tool.name not in SERVER_TOOLS:
+                tool.inputSchema["properties"].update(ATHLETE_OPTION)
+        return tools
+    
+    def _render(self, result: Any, arguments: Dict[str, Any]) -> str:
+        """Project, size-limit and encode a tool result."""
+        config = self.client.config
+        max_bytes = arguments.get("max_bytes")
+        return render(
+            result,
+            fields=arguments.get("fields"),
+            max_bytes=config.response_max_bytes if max_bytes is None else max_bytes,
+            compact=config.compact_json
+        )
+    
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Execute a TrainingPeaks tool call, recording its latency and size."""
+        start = time.perf_counter()
+        with self.metrics.span("mcp.call_tool", tool=name), collect_stale_reads() as stale:
             try:
-                if name == "get_athlete_profile":
-                    result = await self.client.get_athlete_profile()
-
-                elif name == "get_workouts":
-                    result = await self.client.get_workouts(
-                        start_date=arguments.get("start_date"),
-                        end_date=arguments.get("end_date"),
-                        limit=arguments.get("limit", 50)
-                    )
-                    
-                elif name == "get_workout_details":
-                    result = await self.client.get_workout_details(
-                        workout_id=arguments["workout_id"]
-                    )
-                    
-                elif name == "get_calendar_events":
-                    result = await self.client.get_calendar_events(
-                        start_date=arguments.get("start_date"),
-                        end_date=arguments.get("end_date")
-                    )
-                    
-                elif name == "get_metrics":
-                    result = await self.client.get_metrics(
-                        metric_type=arguments["metric_type"],
-                        start_date=arguments.get("start_date"),
-                        end_date=arguments.get("end_date")
-                    )
-                    
-                elif name == "get_planned_workouts":
-                    result = await self.client.get_planned_workouts(
-                        days_ahead=arguments.get("days_ahead", 7)
-                    )
-                    
-                elif name == "set_auth_tokens":
-                    self.auth.set_tokens(
-                        access_token=arguments["access_token"],
-                        refresh_token=arguments["refresh_token"],
-                        expires_in=arguments["expires_in"]
-                    )
-                    result = {"status": "success", "message": "Tokens set successfully"}
-                    
+                result = await self._run(name, arguments)
+                
+                serialize_start = time.perf_counter()
+                if isinstance(result, str):
+                    text = result
                 else:
-                    return CallToolResult(
-                        content=[TextContent(type="text", text=f"Unknown tool: {name}")]
-                    )
+                    text = self._render(result, arguments)
+                end = time.perf_counter()
+                self.metrics.record_tool_call(
+                    name,
+                    end - start,
+                    "ok",
+                    serialization=end - serialize_start,
+                    response_bytes=len(text.encode("utf-8"))
+                )
+                content: List[Any] = [TextContent(type="text", text=text)]
+                if stale:
+                    content.append(TextContent(type="text", text="Stale data: " + "; ".join(stale)))
+                return CallToolResult(content=content)
                 
+            except UnknownToolError:
+                self.metrics.record_tool_call(
+                    "unknown", time.perf_counter() - start, "unknown"
+                )
                 return CallToolResult(
-                    content=[TextContent(type="text", text=json.dumps(result, indent=2))]
+                    content=[TextContent(type="text", text=f"Unknown tool: {name}")]
                 )
                 
             except Exception as e:
+                self.metrics.record_tool_call(name, time.perf_counter() - start, "error")
+                self.metrics.increment(
+                    "tool_errors_total", tool=name, error=type(e).__name__
+                )
+                logger.warning(
+                    "Tool %s failed: %s",
+                    name,
+                    e,
+                    exc_info=logger.isEnabledFor(logging.DEBUG)
+                )
                 error_msg = f"Error calling {name}: {str(e)}"
                 return CallToolResult(
                     content=[TextContent(type="text", text=error_msg)],
                     isError=True
                 )
+    
+    async def _run(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Run a tool for the selected athlete, or for every athlete at once."""
+        if name not in self._tool_names:
+            raise UnknownToolError(name)
+        if name == "get_server_stats":
+            return self.server_stats(arguments.get("format", "json"))
+        if name == "list_athletes":
+            return self._list_athletes()
+        
+        from .athletes import ALL_ATHLETES
+        
+        selector = arguments.get("athlete")
+        if selector != ALL_ATHLETES:
+            return await self._dispatch(name, arguments, self.athletes.get(selector))
+        if name == "set_auth_tokens":
+            raise ValueError("Tokens can only be set for one athlete at a time")
+        return await self.athletes.fan_out(
+            self.athletes.athlete_ids(),
+            lambda athlete: self._dispatch(name, arguments, athlete)
+        )
+    
+    def _list_athletes(self) -> Dict[str, Any]:
+        """Describe every known athlete's token state."""
+        athletes = []
+        for athlete_id in self.athletes.athlete_ids():
+            auth = self.athletes.get(athlete_id).auth
+            athletes.append({
+                "athlete": athlete_id,
+                "authenticated": bool(auth.access_token),
+                "expires_in": (
+                    int(auth.expires_at - time.time()) if auth.expires_at else None
+                ),
+            })
+        return {"count": len(athletes), "athletes": athletes}
+    
+    async def _weekly_summary(
+        self,
+        arguments: Dict[str, Any],
+        athlete: "AthleteContext"
+    ) -> Dict[str, Any]:
+        """Compare the week's planned workouts with those completed."""
+        from .analytics.weekly import week_bounds, weekly_summary
+        
+        today = date.today()
+        day = parse_date(arguments["week_of"]) if arguments.get("week_of") else today
+        week_start, week_end = week_bounds(day)
+        completed = athlete.client.get_workouts(
+            start_date=format_date(week_start),
+            end_date=format_date(week_end),
+            limit=None
+        )
+        if week_end >= today:
+            workouts, planned = await asyncio.gather(
+                completed,
+                athlete.client.get_planned_workouts(days_ahead=7)
+            )
+        else:
+            workouts, planned = await completed, []
+        return weekly_summary(workouts, planned, week_start, today=today)
+    
+    async def _power_curve(
+        self,
+        arguments: Dict[str, Any],
+        athlete: "AthleteContext"
+    ) -> Dict[str, Any]:
+        """Merge per-workout mean-maximal curves into a best-efforts envelope."""
+        from .analytics.curves import (
+            CURVE_CHANNELS, DEFAULT_DURATIONS, envelope, mean_max, speed_to_pace
+        )
+        from .analytics.samples import SAMPLES_KEY, WorkoutSamples
+        from .analytics.weekly import workout_sport
+        
+        today = date.today()
+        end = parse_date(arguments["end_date"]) if arguments.get("end_date") else today
+        start = (
+            parse_date(arguments["start_date"])
+            if arguments.get("start_date") else date(end.year, 1, 1)
+        )
+        if start > end:
+            raise ValueError("start_date must not be after end_date")
+        channel = arguments.get("channel", "power")
+        if channel not in CURVE_CHANNELS:
+            raise ValueError(f"Unsupported channel: {channel!r}")
+        durations = sorted({int(d) for d in arguments.get("durations") or DEFAULT_DURATIONS})
+        sport = arguments.get("sport")
+        
+        workouts = await athlete.client.get_workouts(
+            start_date=format_date(start),
+            end_date=format_date(end),
+            limit=None
+        )
+        days: Dict[str, Optional[str]] = {}
+        for workout in workouts:
+            wid = workout_id(workout)
+            if wid is not None and (not sport or workout_sport(workout).lower() == sport.lower()):
+                days[wid] = workout_date(workout)
+        
+        # Only workouts never analyzed for these durations are fetched
+        index = athlete.curves
+        missing = index.missing(list(days), channel, durations)
+        errors: Dict[str, str] = {}
+        computed = 0
+        if missing:
+            batch = await athlete.client.get_workout_details_batch(list(missing))
+            errors = batch["errors"]
+            recent = format_date(
+                today - timedelta(days=athlete.client.config.workout_store_recent_days)
+            )
+            for wid, details in batch["workouts"].items():
+                samples = details.get(SAMPLES_KEY)
+                values = samples.channel(channel) if isinstance(samples, WorkoutSamples) else None
+                # Recent workouts may still be uploaded, so "no data" is not final
+                if values is None and (days.get(wid) or "") >= recent:
+                    continue
+                index.add(wid, channel, mean_max(values, missing[wid]))
+                computed += 1
+        
+        curves = index.get(list(days), channel)
+        records = envelope(curves, days, durations, top=arguments.get("top", 1))
+        if channel == "speed":
+            for entry in records:
+                entry["pace_s_per_km"] = speed_to_pace(entry["value"])
+                for runner_up in entry.get("runners_up", ()):
+                    runner_up["pace_s_per_km"] = speed_to_pace(runner_up["value"])
+        return {
+            "channel": channel,
+            "start_date": format_date(start),
+            "end_date": format_date(end),
+            "workouts": len(days),
+            "workouts_computed": computed,
+            "records": records,
+            "errors": errors,
+        }
+    
+    async def _time_in_zones(
+        self,
+        arguments: Dict[str, Any],
+        athlete: "AthleteContext"
+    ) -> Dict[str, Any]:
+        """Bin workout samples against the athlete's zones and total the time."""
+        from .analytics.samples import SAMPLES_KEY, WorkoutSamples
+        from .analytics.weekly import workout_sport
+        from .analytics.zones import distribution, parse_zones, time_in_zones, zones_hash
+        
+        zones = parse_zones(await athlete.client.get_athlete_zones())
+        if not zones:
+            raise ValueError("The athlete has no heart rate, power or pace zones")
+        today = date.today()
+        
+        # Workout ID -> (day, sport) when known from the workout list
+        meta: Dict[str, Any] = {}
+        if arguments.get("workout_ids"):
+            ids = list(dict.fromkeys(str(wid) for wid in arguments["workout_ids"]))
+        else:
+            end = parse_date(arguments["end_date"]) if arguments.get("end_date") else today
+            start = (
+                parse_date(arguments["start_date"])
+                if arguments.get("start_date") else end - timedelta(days=27)
+            )
+            if start > end:
+                raise ValueError("start_date must not be after end_date")
+            workouts = await athlete.client.get_workouts(
+                start_date=format_date(start),
+                end_date=format_date(end),
+                limit=None
+            )
+            for workout in workouts:
+                wid = workout_id(workout)
+                if wid is not None:
+                    meta[wid] = {"day": workout_date(workout), "sport": workout_sport(workout)}
+            ids = list(meta)
+        
+        # Entries hold every zone type, so one computation serves any channels filter
+        digest = zones_hash(zones)
+        index = athlete.zone_times
+        entries = index.get(ids, digest)
+        missing = [wid for wid in ids if wid not in entries]
+        errors: Dict[str, str] = {}
+        computed: Dict[str, Dict[str, Any]] = {}
+        if missing:
+            batch = await athlete.client.get_workout_details_batch(missing)
+            errors = batch["errors"]
+            recent = format_date(
+                today - timedelta(days=athlete.client.config.workout_store_recent_days)
+            )
+            for wid, details in batch["workouts"].items():
+                entry = meta.get(wid) or {
+                    "day": workout_date(details), "sport": workout_sport(details)
+                }
+                samples = details.get(SAMPLES_KEY)
+                if isinstance(samples, WorkoutSamples):
+                    entry = {**entry, **time_in_zones(samples, zones)}
+                elif (entry["day"] or "") >= recent:
+                    # Recent workouts may still be uploaded, so "no data" is not final
+                    entries[wid] = entry
+                    continue
+                computed[wid] = entries[wid] = entry
+            if computed:
+                index.add(digest, computed)
+        
+        channels = arguments.get("channels")
+        if channels:
+            zones = {channel: bounds for channel, bounds in zones.items() if channel in channels}
+        with_data = [
+            {**entries[wid], "workout_id": wid} for wid in ids
+            if wid in entries and any(channel in entries[wid] for channel in zones)
+        ]
+        result = distribution(with_data, zones, group_by=arguments.get("group_by", "week"))
+        result.update({
+            "workouts_without_samples": len(entries) - len(with_data),
+            "workouts_computed": len(computed),
+            "errors": errors,
+        })
+        return result
+    
+    async def _dispatch(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        athlete: "AthleteContext"
+    ) -> Any:
+        """Run an athlete tool and return its unserialized result."""
+        result: Any
+        if name == "get_athlete_profile":
+            result = await athlete.client.get_athlete_profile()
 
+        elif name == "get_workouts":
+            fetch_all = arguments.get("fetch_all", False)
+            has_range = arguments.get("start_date") and arguments.get("end_date")
+            if fetch_all and not has_range:
+                raise ValueError("fetch_all requires start_date and end_date")
+            result = await athlete.client.get_workouts(
+                start_date=arguments.get("start_date"),
+                end_date=arguments.get("end_date"),
+                limit=None if fetch_all else arguments.get("limit", 50)
+            )
+            
+        elif name == "get_workout_details":
+            from .analytics.samples import workout_view
+            
+            details = await athlete.client.get_workout_details(
+                workout_id=arguments["workout_id"]
+            )
+            result = workout_view(
+                details,
+                points=arguments.get("sample_points", 0),
+                channels=arguments.get("sample_channels")
+            )
+            
+        elif name == "get_workout_details_batch":
+            from .analytics.samples import workout_view
+            
+            result = await athlete.client.get_workout_details_batch(
+                workout_ids=arguments["workout_ids"],
+                concurrency=arguments.get("concurrency")
+            )
+            result["workouts"] = {
+                workout_id: workout_view(
+                    details,
+                    points=arguments.get("sample_points", 0),
+                    channels=arguments.get("sample_channels")
+                )
+                for workout_id, details in result["workouts"].items()
+            }
+            
+        elif name == "get_calendar_events":
+            result = await athlete.client.get_calendar_events(
+                start_date=arguments.get("start_date"),
+                end_date=arguments.get("end_date")
+            )
+            
+        elif name == "get_metrics":
+            result = await athlete.client.get_metrics(
+                metric_type=arguments["metric_type"],
+                start_date=arguments.get("start_date"),
+                end_date=arguments.get("end_date")
+            )
+            reduce_options = ("aggregate", "baseline_days", "max_points")
+            if any(arguments.get(option) for option in reduce_options):
+                from .analytics.series import summarize_metrics
+                
+                result = summarize_metrics(
+                    result,
+                    arguments["metric_type"],
+                    period=arguments.get("aggregate"),
+                    percentiles=arguments.get("percentiles") or (),
+                    baseline_days=arguments.get("baseline_days"),
+                    max_points=arguments.get("max_points")
+                )
+            
+        elif name == "get_planned_workouts":
+            result = await athlete.client.get_planned_workouts(
+                days_ahead=arguments.get("days_ahead", 7)
+            )
+            
+        elif name == "get_performance_management":
+            result = await self._performance_management(arguments, athlete)
+            
+        elif name == "get_power_curve":
+            result = await self._power_curve(arguments, athlete)
+            
+        elif name == "get_time_in_zones":
+            result = await self._time_in_zones(arguments, athlete)
+            
+        elif name == "get_weekly_summary":
+            result = await self._weekly_summary(arguments, athlete)
+            
+        elif name == "set_auth_tokens":
+            await athlete.auth.update_tokens(
+                access_token=arguments["access_token"],
+                refresh_token=arguments["refresh_token"],
+                expires_in=arguments["expires_in"]
+            )
+            athlete.reset()
+            result = {"status": "success", "message": "Tokens set successfully"}
+            
+        else:
+            raise UnknownToolError(name)
+        
+        return result
+    
+    def _setup_tools(self) -> None:
+        """Setup MCP tools for TrainingPeaks API."""
+        
+        @self.server.list_tools()
+        async def list_tools() -> List[Tool]:
+            """List available TrainingPeaks tools."""
+            return self.tools()
+        
+        @self.server.call_tool()
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
+            """Execute TrainingPeaks tool calls."""
+            return await self.call_tool(name, arguments)
 
-async def amain():
+
+async def amain() -> None:
     """Async main entry point for the TrainingPeaks MCP server."""
+    from .config import get_config
+    
     mcp_server = TrainingPeaksMCPServer()
     
-    async with stdio_server() as (read_stream, write_stream):
-        await mcp_server.server.run(
-            read_stream,
-            write_stream,
-            InitializeResult(
-                protocolVersion="2024-11-05",
-                serverInfo=Implementation(
-                    name="trainingpeaks-mcp-server",
-                    version="0.1.0"
-                ),
-                capabilities=mcp_server.server.get_capabilities(
+    try:
+        if get_config().prefetch_enabled:
+            mcp_server.warm_up()
+        async with stdio_server() as (read_stream, write_stream):
+            await mcp_server.server.run(
+                read_stream,
+                write_stream,
+                mcp_server.server.create_initialization_options(
                     notification_options=NotificationOptions(),
-                    experimental_capabilities=None
+                    experimental_capabilities={}
                 )
             )
-        )
+    finally:
+        await mcp_server.aclose()
 
 
-def main():
+def main() -> None:
     """Main entry point for the TrainingPeaks MCP server."""
-    asyncio.run(amain())
+    from .config import get_config
+    
+    parser = argparse.ArgumentParser(description="TrainingPeaks MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"])
+    parser.add_argument("--host", help="HTTP bind address")
+    parser.add_argument("--port", type=int, help="HTTP port")
+    parser.add_argument("--workers", type=int, help="HTTP worker processes")
+    parser.add_argument(
+        "--stateless",
+        action="store_true",
+        default=None,
+        help="Handle every HTTP request without a session"
+    )
+    args = parser.parse_args()
+    
+    # Go through the environment so that HTTP worker processes see the options too
+    overrides = {
+        "TRAININGPEAKS_TRANSPORT": args.transport,
+        "TRAININGPEAKS_HTTP_HOST": args.host,
+        "TRAININGPEAKS_HTTP_PORT": args.port,
+        "TRAININGPEAKS_HTTP_WORKERS": args.workers,
+        "TRAININGPEAKS_HTTP_STATELESS": args.stateless,
+    }
+    os.environ.update({key: str(value) for key, value in overrides.items() if value is not None})
+    get_config.cache_clear()
+    
+    if get_config().transport == "http":
+        from .http_server import serve
+        
+        serve()
+    else:
+        asyncio.run(amain())
 
 
 if __name__ == "__main__":
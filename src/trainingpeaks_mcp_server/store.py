@@ -0,0 +1,257 @@
+"""Local SQLite store for workouts and the date ranges already synced."""
+
+import json
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from .dates import (
+    DateRange,
+    format_date,
+    merge_ranges,
+    parse_date,
+    subtract_ranges,
+    workout_date,
+    workout_id,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    id TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workouts_day ON workouts (day, id);
+CREATE TABLE IF NOT EXISTS synced_ranges (
+    start_day TEXT NOT NULL,
+    end_day TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS curves (
+    workout_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (workout_id, channel, duration)
+);
+CREATE TABLE IF NOT EXISTS zone_times (
+    workout_id TEXT PRIMARY KEY,
+    zones_hash TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# SQLite's default limit on host parameters per statement is 999
+QUERY_CHUNK = 500
+
+
+class WorkoutStore:
+    """Index of workouts by day plus the day ranges known to be complete.
+
+    Queries are small indexed lookups, so they run synchronously on the
+    caller's thread; a lock serializes access to the shared connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+            self.path = str(Path(path).expanduser())
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def synced_ranges(self) -> List[DateRange]:
+        """Get the merged day ranges that are fully synced."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start_day, end_day FROM synced_ranges"
+            ).fetchall()
+        return merge_ranges([(parse_date(s), parse_date(e)) for s, e in rows])
+
+    def missing_ranges(self, start: date, end: date) -> List[DateRange]:
+        """Get the sub-ranges of ``start``..``end`` that still need syncing."""
+        return subtract_ranges(start, end, self.synced_ranges())
+
+    def replace_range(
+        self,
+        start: date,
+        end: date,
+        workouts: Iterable[Dict[str, Any]],
+        mark_synced_until: Optional[date] = None
+    ) -> None:
+        """Replace the workouts stored for a day range with fresh API data.
+
+        The range is recorded as synced up to ``mark_synced_until`` (default
+        ``end``); days after it are stored but fetched again next time.
+        """
+        rows = []
+        for workout in workouts:
+            day, wid = workout_date(workout), workout_id(workout)
+            if day is None or wid is None:
+                continue
+            rows.append((wid, day, json.dumps(workout)))
+        synced_end = end if mark_synced_until is None else min(end, mark_synced_until)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM workouts WHERE day BETWEEN ? AND ?",
+                (format_date(start), format_date(end)),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO workouts (id, day, data) VALUES (?, ?, ?)",
+                rows,
+            )
+            if synced_end >= start:
+                self._mark_synced(start, synced_end)
+
+    def _mark_synced(self, start: date, end: date) -> None:
+        rows = self._conn.execute(
+            "SELECT start_day, end_day FROM synced_ranges"
+        ).fetchall()
+        ranges = [(parse_date(s), parse_date(e)) for s, e in rows]
+        merged = merge_ranges(ranges + [(start, end)])
+        self._conn.execute("DELETE FROM synced_ranges")
+        self._conn.executemany(
+            "INSERT INTO synced_ranges (start_day, end_day) VALUES (?, ?)",
+            [(format_date(s), format_date(e)) for s, e in merged],
+        )
+
+    def query(
+        self,
+        start: date,
+        end: date,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get stored workouts for a day range, ordered by day."""
+        sql = "SELECT data FROM workouts WHERE day BETWEEN ? AND ? ORDER BY day, id"
+        params: List[Any] = [format_date(start), format_date(end)]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def curve_points(
+        self,
+        workout_ids: Sequence[str],
+        channel: str
+    ) -> Dict[str, Dict[int, Optional[float]]]:
+        """Get the stored mean-maximal values by workout ID and duration."""
+        points: Dict[str, Dict[int, Optional[float]]] = {}
+        with self._lock:
+            for i in range(0, len(workout_ids), QUERY_CHUNK):
+                chunk = list(workout_ids[i:i + QUERY_CHUNK])
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT workout_id, duration, value FROM curves"
+                    f" WHERE channel = ? AND workout_id IN ({marks})",
+                    [channel, *chunk],
+                ).fetchall()
+                for wid, duration, value in rows:
+                    points.setdefault(wid, {})[duration] = value
+        return points
+
+    def save_curve_points(
+        self,
+        channel: str,
+        rows: Iterable[Tuple[str, int, Optional[float]]]
+    ) -> None:
+        """Store (workout ID, duration, value) mean-maximal points for a channel."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO curves (workout_id, channel, duration, value)"
+                " VALUES (?, ?, ?, ?)",
+                [(wid, channel, duration, value) for wid, duration, value in rows],
+            )
+
+    def zone_times(
+        self,
+        workout_ids: Sequence[str],
+        zones_hash: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get stored time-in-zone entries computed against the given zones."""
+        entries: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for i in range(0, len(workout_ids), QUERY_CHUNK):
+                chunk = list(workout_ids[i:i + QUERY_CHUNK])
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT workout_id, data FROM zone_times"
+                    f" WHERE zones_hash = ? AND workout_id IN ({marks})",
+                    [zones_hash, *chunk],
+                ).fetchall()
+                for wid, data in rows:
+                    entries[wid] = json.loads(data)
+        return entries
+
+    def save_zone_times(
+        self,
+        zones_hash: str,
+        entries: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """Store time-in-zone entries by ID, dropping those for other zones."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM zone_times WHERE zones_hash != ?", (zones_hash,)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO zone_times (workout_id, zones_hash, data)"
+                " VALUES (?, ?, ?)",
+                [
+                    (wid, zones_hash, json.dumps(entry))
+                    for wid, entry in entries.items()
+                ],
+            )
+
+    def owner(self) -> Optional[str]:
+        """Get the ID of the athlete whose data the store holds, if recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'owner'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def claim(self, owner: str) -> bool:
+        """Record the athlete the store belongs to; return True if it was cleared.
+
+        Data recorded for another athlete is dropped first. A store without a
+        recorded owner is kept as is.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'owner'"
+            ).fetchone()
+            if row is not None and row[0] == owner:
+                return False
+            cleared = row is not None
+            if cleared:
+                self._clear()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('owner', ?)", (owner,)
+            )
+        return cleared
+
+    def clear(self) -> None:
+        """Drop all stored workouts, sync state and analytics."""
+        with self._lock, self._conn:
+            self._clear()
+            self._conn.execute("DELETE FROM meta WHERE key = 'owner'")
+
+    def _clear(self) -> None:
+        self._conn.execute("DELETE FROM workouts")
+        self._conn.execute("DELETE FROM synced_ranges")
+        self._conn.execute("DELETE FROM curves")
+        self._conn.execute("DELETE FROM zone_times")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
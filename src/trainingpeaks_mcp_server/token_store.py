@@ -0,0 +1,114 @@
+"""Persistent on-disk storage for OAuth tokens."""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore[assignment]
+
+
+class TokenStore:
+    """Store tokens in a JSON file shared by restarts and server processes.
+
+    Writes are atomic (write to a temporary file, then rename over the
+    target) and an advisory lock file serializes refreshes across processes.
+    ``save`` does not take the lock itself; callers hold ``lock()`` around
+    any read-modify-write sequence.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path).expanduser()
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._mtime_ns: Optional[int] = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Load stored token data, or ``None`` if nothing usable is stored."""
+        try:
+            stat = self.path.stat()
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._mtime_ns = stat.st_mtime_ns
+        return data if isinstance(data, dict) else None
+
+    def has_changed(self) -> bool:
+        """Check whether the file was modified since it was last loaded or saved."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            return False
+        return mtime_ns != self._mtime_ns
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Atomically write token data, readable only by the current user."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{self.path.name}.", dir=str(self.path.parent)
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._mtime_ns = self.path.stat().st_mtime_ns
+
+    def clear(self) -> None:
+        """Remove stored tokens."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        self._mtime_ns = None
+
+    def acquire(self) -> int:
+        """Block until the cross-process lock is held; return its descriptor."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.lock_path), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def release(self, fd: int) -> None:
+        """Release a lock obtained from ``acquire``."""
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the cross-process lock for the duration of the block."""
+        fd = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(fd)
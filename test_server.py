@@ -20,9 +20,16 @@ async def test_server():
     print("  - get_athlete_profile")
     print("  - get_workouts")
     print("  - get_workout_details")
+    print("  - get_workout_details_batch")
     print("  - get_calendar_events")
     print("  - get_metrics")
     print("  - get_planned_workouts")
+    print("  - get_performance_management")
+    print("  - get_power_curve")
+    print("  - get_time_in_zones")
+    print("  - get_weekly_summary")
+    print("  - list_athletes")
+    print("  - get_server_stats")
     print("  - set_auth_tokens")
     
     print("\nServer test completed successfully!")
@@ -0,0 +1,45 @@
+"""Tests for coalescing concurrent identical GETs into one upstream call."""
+
+import asyncio
+
+from mock_api import MockTrainingPeaksAPI
+
+from trainingpeaks_mcp_server.auth import TrainingPeaksAuth
+from trainingpeaks_mcp_server.client import TrainingPeaksClient
+from trainingpeaks_mcp_server.config import TrainingPeaksConfig
+from trainingpeaks_mcp_server.http_client import SharedHTTPClient
+
+
+async def run_concurrent(coalesce, calls=10):
+    async with MockTrainingPeaksAPI(latency=0.05) as api:
+        config = TrainingPeaksConfig(
+            base_url=api.base_url,
+            token_store_path=None,
+            workout_store_path=None,
+            cache_enabled=False,
+            coalesce_requests=coalesce,
+            rate_limit_enabled=False,
+            hedge_enabled=False,
+        )
+        http = SharedHTTPClient(config)
+        auth = TrainingPeaksAuth(config=config, http=http)
+        auth.set_tokens("mock-access-token", "mock-refresh-token", 3600)
+        client = TrainingPeaksClient(auth)
+        try:
+            results = await asyncio.gather(
+                *(client.get_athlete_profile() for _ in range(calls))
+            )
+        finally:
+            await http.aclose()
+        return results, api.requests
+
+
+async def test_identical_gets_share_one_call():
+    results, requests = await run_concurrent(coalesce=True)
+    assert requests == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_without_coalescing_each_get_is_sent():
+    _, requests = await run_concurrent(coalesce=False)
+    assert requests == 10
@@ -0,0 +1,56 @@
+"""Tests for day-range arithmetic and the workout store's sync bookkeeping."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from trainingpeaks_mcp_server.dates import subtract_ranges
+from trainingpeaks_mcp_server.store import WorkoutStore
+
+
+def d(day: int) -> date:
+    return date(2024, 1, day)
+
+
+@pytest.mark.parametrize(
+    "covered, gaps",
+    [
+        ([], [(d(1), d(31))]),
+        ([(d(1), d(31))], []),
+        ([(d(5), d(10)), (d(8), d(12))], [(d(1), d(4)), (d(13), d(31))]),
+        ([(d(5), d(10)), (d(11), d(15))], [(d(1), d(4)), (d(16), d(31))]),
+        ([(d(3), d(20)), (d(5), d(6))], [(d(1), d(2)), (d(21), d(31))]),
+        ([(d(10), d(12)), (d(2), d(4))], [(d(1), d(1)), (d(5), d(9)), (d(13), d(31))]),
+        ([(date(2023, 12, 1), d(3)), (d(29), date(2024, 2, 5))], [(d(4), d(28))]),
+        ([(date(2023, 1, 1), date(2023, 2, 1))], [(d(1), d(31))]),
+    ],
+)
+def test_subtract_ranges(covered, gaps):
+    assert subtract_ranges(d(1), d(31), covered) == gaps
+
+
+def test_subtract_ranges_matches_day_by_day():
+    covered = [(d(2), d(6)), (d(4), d(9)), (d(15), d(15)), (d(14), d(20))]
+    days = {d(1) + timedelta(days=i) for i in range(31)}
+    for start, end in covered:
+        days -= {start + timedelta(days=i) for i in range((end - start).days + 1)}
+    gaps = subtract_ranges(d(1), d(31), covered)
+    expected = set()
+    for start, end in gaps:
+        expected |= {start + timedelta(days=i) for i in range((end - start).days + 1)}
+    assert expected == days
+
+
+def test_missing_ranges_with_overlapping_syncs():
+    store = WorkoutStore(":memory:")
+    store.replace_range(d(5), d(12), [])
+    store.replace_range(d(10), d(15), [])
+    store.replace_range(d(20), d(25), [], mark_synced_until=d(22))
+
+    assert store.synced_ranges() == [(d(5), d(15)), (d(20), d(22))]
+    assert store.missing_ranges(d(1), d(31)) == [
+        (d(1), d(4)),
+        (d(16), d(19)),
+        (d(23), d(31)),
+    ]
+    assert store.missing_ranges(d(6), d(14)) == []
@@ -0,0 +1,34 @@
+"""Tests for the vectorized EWMA behind fitness and fatigue."""
+
+import numpy as np
+import pytest
+
+from trainingpeaks_mcp_server.analytics.pmc import ewma
+
+
+def recurrence(values, time_constant, initial=0.0):
+    out = []
+    y = initial
+    for x in values:
+        y += (x - y) / time_constant
+        out.append(y)
+    return np.array(out)
+
+
+@pytest.mark.parametrize(
+    "time_constant", [1.0, 1.01, 1.1, 1.5, 2.0, 3.0, 7.0, 42.0, 365.0]
+)
+def test_ewma_matches_recurrence(time_constant):
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 250, size=1500)
+    values[rng.random(1500) < 0.3] = 0.0
+    np.testing.assert_allclose(
+        ewma(values, time_constant, initial=40.0),
+        recurrence(values, time_constant, initial=40.0),
+        rtol=1e-9,
+        atol=1e-9,
+    )
+
+
+def test_ewma_of_empty_series():
+    assert len(ewma(np.zeros(0), 42.0)) == 0
@@ -0,0 +1,77 @@
+"""Tests for stream-parsing workout samples with and without ijson."""
+
+import json
+
+import numpy as np
+import pytest
+
+from trainingpeaks_mcp_server.analytics import samples
+from trainingpeaks_mcp_server.analytics.samples import (
+    SampleStreamParser,
+    WorkoutSamples,
+)
+
+COLUMNAR = {
+    "id": 7,
+    "title": "Intervals",
+    "samples": {
+        "power": [200, 210.5, None, 250, 0],
+        "heartRate": [120, 125, 130, None, 128],
+    },
+    "laps": [{"index": 1, "power": 230}],
+}
+
+RECORDS = {
+    "id": 8,
+    "samples": [
+        {"power": 200, "heartRate": 120},
+        {"power": 210},
+        {"heartRate": 131, "cadence": 90},
+        {"power": None, "heartRate": 133, "cadence": 92},
+    ],
+    "tssActual": 55.5,
+}
+
+
+def parse(document, chunk_size):
+    body = json.dumps(document).encode("utf-8")
+    parser = SampleStreamParser()
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i:i + chunk_size])
+    return parser.result()
+
+
+def assert_same(left, right):
+    left_samples, right_samples = left.pop("samples"), right.pop("samples")
+    assert left == right
+    assert isinstance(left_samples, WorkoutSamples)
+    assert isinstance(right_samples, WorkoutSamples)
+    assert set(left_samples.channels) == set(right_samples.channels)
+    for name, values in left_samples.channels.items():
+        assert values.dtype == np.float32
+        np.testing.assert_array_equal(values, right_samples.channels[name])
+
+
+@pytest.mark.skipif(samples.ijson is None, reason="ijson is not installed")
+@pytest.mark.parametrize("document", [COLUMNAR, RECORDS])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_parse_matches_without_ijson(monkeypatch, document, chunk_size):
+    streamed = parse(document, chunk_size)
+    monkeypatch.setattr(samples, "ijson", None)
+    buffered = parse(document, chunk_size)
+    assert_same(streamed, buffered)
+
+
+def test_records_are_padded_with_nan():
+    result = parse(RECORDS, 1 << 16)["samples"]
+    np.testing.assert_array_equal(
+        result.channel("cadence"), np.array([np.nan, np.nan, 90, 92], np.float32)
+    )
+    np.testing.assert_array_equal(
+        result.channel("power"), np.array([200, 210, np.nan, np.nan], np.float32)
+    )
+
+
+def test_document_without_samples():
+    document = {"id": 9, "title": "Rest day"}
+    assert parse(document, 3) == document
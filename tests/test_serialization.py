@@ -0,0 +1,43 @@
+"""Tests for byte budgets on rendered tool results."""
+
+import pytest
+
+from trainingpeaks_mcp_server.serialization import dumps, fit_budget, render
+
+
+def workouts(count):
+    return [
+        {"id": i, "title": f"Ride {i}", "description": "x" * (i % 50)}
+        for i in range(count)
+    ]
+
+
+RESULTS = [
+    workouts(500),
+    {"workouts": workouts(300), "athlete": {"id": 1, "name": "Test"}},
+    {"dates": [f"2024-01-{i % 28 + 1:02d}" for i in range(400)],
+     "ctl": [i / 3 for i in range(400)],
+     "atl": [i / 7 for i in range(400)]},
+    {"a": workouts(200), "b": {"nested": workouts(200)}},
+]
+
+
+@pytest.mark.parametrize("value", RESULTS)
+@pytest.mark.parametrize("max_bytes", [1024, 4096, 20000])
+@pytest.mark.parametrize("compact", [True, False])
+def test_render_stays_under_max_bytes(value, max_bytes, compact):
+    text = render(value, max_bytes=max_bytes, compact=compact)
+    assert len(text.encode("utf-8")) <= max_bytes
+
+
+@pytest.mark.parametrize("value", RESULTS)
+def test_fit_budget_agrees_with_render(value):
+    fitted = fit_budget(value, 4096)
+    assert len(dumps(fitted)) <= 4096
+    assert render(value, max_bytes=4096) == dumps(fitted).decode("utf-8")
+
+
+def test_result_within_budget_is_unchanged():
+    value = {"workouts": workouts(3)}
+    assert fit_budget(value, 1 << 20) is value
+    assert render(value, max_bytes=1 << 20) == dumps(value).decode("utf-8")